@@ -0,0 +1,316 @@
+import argparse
+import contextlib
+import heapq
+import io
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import main as dispatcher
+from syntheticData import make_fake_proc, make_log_lines, make_process_table, make_window_titles, patched
+
+
+# Child script for a cold dispatch: a fresh interpreter imports main, then only the dispatch is timed
+COLD_DISPATCH_SCRIPT = """\
+import contextlib, io, sys, time
+import main
+start = time.perf_counter()
+with contextlib.redirect_stdout(io.StringIO()):
+    main.dispatch(sys.argv[1], sys.argv[2:], interactive=False)
+print(time.perf_counter() - start)
+"""
+
+
+# Time one cold in-process dispatch. It runs in a fresh interpreter, so the tool module and
+# everything it imports (psutil, outputFormats, ...) are loaded from scratch, not found in sys.modules.
+def time_cold_dispatch(command, extra_args):
+    completed = subprocess.run([sys.executable, '-c', COLD_DISPATCH_SCRIPT, command] + extra_args,
+                               cwd=dispatcher.BASE_DIR, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE,
+                               text=True, check=True)
+    return float(completed.stdout.splitlines()[-1])
+
+
+# Time one run through the old path: a fresh interpreter per command
+def time_subprocess_dispatch(command, extra_args):
+    tool = dispatcher.load_registry()[command]
+    script = os.path.join(dispatcher.BASE_DIR, tool['filename'])
+
+    start = time.perf_counter()
+    subprocess.run([sys.executable, script] + extra_args, stdout=subprocess.DEVNULL, check=False)
+    return time.perf_counter() - start
+
+
+def bench_dispatch(command='help', extra_args=None, rounds=10):
+    """Compare cold in-process dispatch against spawning the tool script."""
+    extra_args = extra_args or []
+    in_process = [time_cold_dispatch(command, extra_args) for _ in range(rounds)]
+    spawned = [time_subprocess_dispatch(command, extra_args) for _ in range(rounds)]
+
+    in_process_ms = statistics.median(in_process) * 1000
+    spawned_ms = statistics.median(spawned) * 1000
+    print(f"Dispatch '{command}' over {rounds} rounds (median):")
+    print(f"  in-process (cold): {in_process_ms:.2f} ms")
+    print(f"  subprocess:        {spawned_ms:.2f} ms")
+    print(f"  speedup:           {spawned_ms / in_process_ms:.1f}x")
+    return in_process_ms, spawned_ms
+
+
+def bench_backend(sizes=(1000, 10000), rounds=5, top=10):
+    """Time ProcBackend snapshots over synthetic /proc trees of each size."""
+    import procBackend
+
+    results = {}
+    for size in sizes:
+        root = tempfile.mkdtemp(prefix='fakeproc')
+        try:
+            make_fake_proc(root, size)
+            backend = procBackend.ProcBackend(root)
+            full = [_timed(backend.snapshot) for _ in range(rounds)]
+            ranked = [_timed(backend.top_processes, 'cpu_percent', top) for _ in range(rounds)]
+        finally:
+            shutil.rmtree(root)
+        results[size] = (statistics.median(full) * 1000, statistics.median(ranked) * 1000)
+        print(f"/proc backend, {size} processes (median of {rounds}):")
+        print(f"  full snapshot:     {results[size][0]:.2f} ms")
+        print(f"  top {top} by cpu:     {results[size][1]:.2f} ms")
+    return results
+
+
+def bench_filter(expressions=('name~^python', 'rss>10MB'), order_by='memory', rounds=5, top=10):
+    """Compare --where pushed into the snapshot against filtering after collecting everything."""
+    import listWindows
+    from processFilter import ProcessFilter
+
+    where = ProcessFilter(expressions)
+
+    def filter_after():
+        fields = listWindows.METRIC_FIELDS + ('rss',)
+        rows = [row for row, _ in listWindows.snapshot_processes(fields, ('ppid', 'username'))]
+        sort_field = listWindows.ORDER_FIELDS[order_by]
+        return heapq.nlargest(top, (row for row in rows if where.accepts_all(row)), key=lambda row: row[sort_field])
+
+    pushed = [_timed(listWindows.get_top_processes, order_by, top, 'psutil', where) for _ in range(rounds)]
+    after = [_timed(filter_after) for _ in range(rounds)]
+    pushed_ms = statistics.median(pushed) * 1000
+    after_ms = statistics.median(after) * 1000
+    print(f"Filter {' and '.join(expressions)}, ordered by {order_by} (median of {rounds}):")
+    print(f"  pushed down:           {pushed_ms:.2f} ms")
+    print(f"  after collection:      {after_ms:.2f} ms")
+    print(f"  speedup:               {after_ms / pushed_ms:.1f}x")
+    return pushed_ms, after_ms
+
+
+def _timed(func, *args):
+    start = time.perf_counter()
+    func(*args)
+    return time.perf_counter() - start
+
+
+BASELINES_PATH = os.path.join(dispatcher.BASE_DIR, 'benchmark_baselines.json')
+# Absolute slack on top of the relative thresholds: sub-millisecond stages jitter by more than 1.5x,
+# and so do peaks of a few KiB (interpreter caches, free-list reuse)
+WALL_TOLERANCE_MS = 1.0
+PEAK_TOLERANCE_KB = 16.0
+
+# Error strings fed to help.handle_error: known types, subclasses of known types and unknown ones
+ERROR_SAMPLES = (
+    "FileNotFoundError: [Errno 2] No such file or directory: 'output.txt'",
+    "ZeroDivisionError: division by zero",
+    "KeyError: 'name'",
+    "psutil.AccessDenied: (pid=4, name='System')",
+    "ConnectionResetError: [Errno 104] Connection reset by peer",
+    "UnicodeDecodeError: 'utf-8' codec can't decode byte 0xff",
+)
+
+
+# Fixed pure-Python workload timed next to every stage; stage baselines are scaled by how fast
+# this machine (right now) runs it compared with when the baseline was stored
+def calibration_workload():
+    total = 0
+    for index in range(50000):
+        total += index % 7
+    return total
+
+
+# Function to run a stage `rounds` times for wall time, then once more under tracemalloc.
+# Each round is paired with a calibration round, and the fastest of each is kept: noise
+# (scheduling, other processes, frequency scaling) only ever adds time.
+# A self_timed stage returns its own duration in seconds (e.g. one measured in a child interpreter);
+# its memory isn't in this process, so it gets no tracemalloc pass and None for blocks and peak.
+def measure_stage(run, rounds, self_timed=False):
+    run()  # warm-up: imports, caches and first-call costs are not what we track
+    wall = []
+    calibration = []
+    for _ in range(rounds):
+        calibration.append(_timed(calibration_workload))
+        wall.append(run() if self_timed else _timed(run))
+    timing = {'wall_ms': round(min(wall) * 1000, 3), 'calibration_ms': round(min(calibration) * 1000, 3)}
+    if self_timed:
+        return dict(timing, live_blocks=None, peak_kb=None)
+
+    tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot()
+        result = run()  # kept alive so what the stage returns counts as allocated
+        after = tracemalloc.take_snapshot()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    live_blocks = sum(stat.count_diff for stat in after.compare_to(before, 'filename'))
+    del result
+    return dict(timing, live_blocks=live_blocks, peak_kb=round(peak / 1024, 1))
+
+
+# Function to list (name, callable) pairs for every stage and input size of the suite
+def suite_stages(process_sizes, window_sizes, errors=1000, log_lines=200000):
+    import help as help_module
+    import listWindows
+
+    stages = []
+    for size in process_sizes:
+        fake = make_process_table(size)
+        stages.append((f"get_top_processes cpu n={size}",
+                       lambda fake=fake: _with_psutil(fake, listWindows.get_top_processes, 'cpu', 10)))
+        stages.append((f"display_top_processes memory n={size}",
+                       lambda fake=fake: _with_psutil(fake, listWindows.display_top_processes, 'memory', None,
+                                                      os.devnull, 10, 'psutil', 'text', False)))
+    for size in window_sizes:
+        titles = make_window_titles(size)
+        stages.append((f"print_matrix_windows n={size}",
+                       lambda titles=titles: _quiet(listWindows.print_matrix_windows, titles, os.devnull, 'text', False)))
+
+    messages = [ERROR_SAMPLES[index % len(ERROR_SAMPLES)] for index in range(errors)]
+
+    def handle_errors():
+        with patched(help_module, 'get_user_confirmation', lambda prompt="": False):
+            for message in messages:
+                _quiet(help_module.handle_error, message)
+
+    stages.append((f"help.handle_error x{errors}", handle_errors))
+
+    log = b"".join(make_log_lines(log_lines))
+    stages.append((f"help.scan_log n={log_lines}", lambda: help_module.scan_log(io.BytesIO(log))))
+    stages.append(("main.dispatch help (cold)", SelfTimed(lambda: time_cold_dispatch('help', []))))
+    return stages
+
+
+class SelfTimed:
+    """Marks a suite stage whose callable returns its own duration instead of being timed around."""
+
+    def __init__(self, run):
+        self.run = run
+
+    def __call__(self):
+        return self.run()
+
+
+def _with_psutil(fake, func, *args):
+    import listWindows
+    with patched(listWindows, 'psutil', fake), contextlib.redirect_stdout(io.StringIO()):
+        return func(*args)
+
+
+def _quiet(func, *args):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return func(*args)
+
+
+# Function to scale a stage's baseline time by how much slower the calibration ran this time
+def expected_ms(result, baseline):
+    if not baseline.get('calibration_ms'):
+        return baseline['wall_ms']
+    return baseline['wall_ms'] * result['calibration_ms'] / baseline['calibration_ms']
+
+
+# Function to compare results with stored baselines; returns the names of regressed stages
+def find_regressions(results, baselines, threshold):
+    regressed = []
+    for name, result in results.items():
+        baseline = baselines.get(name)
+        if baseline is None:
+            continue
+        slower = result['wall_ms'] > expected_ms(result, baseline) * threshold + WALL_TOLERANCE_MS
+        bigger = (result['peak_kb'] is not None and baseline.get('peak_kb') is not None
+                  and result['peak_kb'] > baseline['peak_kb'] * threshold + PEAK_TOLERANCE_KB)
+        if slower or bigger:
+            regressed.append(name)
+    return regressed
+
+
+def bench_suite(process_sizes=(100, 1000, 10000, 50000), window_sizes=(100, 1000, 10000), rounds=15,
+                baselines_path=BASELINES_PATH, threshold=1.5, update=False):
+    """Run every stage over synthetic inputs and check wall time and peak memory against the baselines."""
+    baselines = {}
+    if os.path.exists(baselines_path):
+        with open(baselines_path) as f:
+            baselines = json.load(f)['stages']
+
+    results = {}
+    print(f"Best of {rounds} rounds; baselines are scaled by the calibration time measured next to each stage\n")
+    print(f"{'stage':<42}{'wall ms':>10}{'calib ms':>10}{'live blocks':>13}{'peak KiB':>11}{'expected ms':>13}")
+    for name, run in suite_stages(process_sizes, window_sizes):
+        result = results[name] = measure_stage(run, rounds, isinstance(run, SelfTimed))
+        expected = f"{expected_ms(result, baselines[name]):.2f}" if name in baselines else '-'
+        live_blocks = result['live_blocks'] if result['live_blocks'] is not None else 'n/a'
+        peak = f"{result['peak_kb']:.1f}" if result['peak_kb'] is not None else 'n/a'
+        print(f"{name:<42}{result['wall_ms']:>10.2f}{result['calibration_ms']:>10.2f}{live_blocks:>13}"
+              f"{peak:>11}{expected:>13}")
+
+    if update:
+        with open(baselines_path, 'w') as f:
+            json.dump({'python': sys.version.split()[0], 'rounds': rounds, 'stages': results}, f, indent=2)
+            f.write("\n")
+        print(f"Baselines written to {baselines_path}")
+        return 0
+
+    regressed = find_regressions(results, baselines, threshold)
+    for name in regressed:
+        print(f"REGRESSION: {name} (more than {threshold}x its expected time + {WALL_TOLERANCE_MS} ms, or {threshold}x its peak + {PEAK_TOLERANCE_KB} KiB)")
+    return 1 if regressed else 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark randomTools hot paths.")
+    subparsers = parser.add_subparsers(dest='bench', required=True)
+
+    dispatch_parser = subparsers.add_parser('dispatch', help="Cold in-process dispatch versus a subprocess per command.")
+    dispatch_parser.add_argument('command', nargs='?', default='help', help="Tool to dispatch (default is help).")
+    dispatch_parser.add_argument('extra_args', nargs=argparse.REMAINDER, help="Arguments passed to the tool.")
+    dispatch_parser.add_argument('-r', '--rounds', type=int, default=10, help="Number of rounds per path (default is 10).")
+
+    backend_parser = subparsers.add_parser('backend', help="/proc snapshot backend over synthetic process tables.")
+    backend_parser.add_argument('-s', '--sizes', type=int, nargs='+', default=[1000, 10000], help="Process counts to generate (default is 1000 10000).")
+    backend_parser.add_argument('-r', '--rounds', type=int, default=5, help="Number of rounds per size (default is 5).")
+
+    filter_parser = subparsers.add_parser('filter', help="--where pushdown versus filtering after collection (live processes).")
+    filter_parser.add_argument('expressions', nargs='*', default=['name~^python', 'rss>10MB'], help="Filter expressions (default is name~^python rss>10MB).")
+    filter_parser.add_argument('-r', '--rounds', type=int, default=5, help="Number of rounds per path (default is 5).")
+
+    suite_parser = subparsers.add_parser('suite', help="Every hot path over synthetic processes and windows, checked against stored baselines.")
+    suite_parser.add_argument('-p', '--processes', type=int, nargs='+', default=[100, 1000, 10000, 50000], help="Process table sizes (default is 100 1000 10000 50000).")
+    suite_parser.add_argument('-w', '--windows', type=int, nargs='+', default=[100, 1000, 10000], help="Window counts (default is 100 1000 10000).")
+    suite_parser.add_argument('-r', '--rounds', type=int, default=15, help="Timed rounds per stage; the fastest counts (default is 15).")
+    suite_parser.add_argument('-b', '--baselines', default=BASELINES_PATH, help="Baselines file (default is benchmark_baselines.json).")
+    suite_parser.add_argument('-t', '--threshold', type=float, default=1.5, help="Fail when a stage exceeds this multiple of its baseline (default is 1.5).")
+    suite_parser.add_argument('--update', action='store_true', help="Write the results as the new baselines instead of checking.")
+
+    args = parser.parse_args(argv)
+    if args.bench == 'dispatch':
+        bench_dispatch(args.command, args.extra_args, args.rounds)
+    elif args.bench == 'backend':
+        bench_backend(args.sizes, args.rounds)
+    elif args.bench == 'filter':
+        bench_filter(args.expressions, rounds=args.rounds)
+    elif args.bench == 'suite':
+        return bench_suite(args.processes, args.windows, args.rounds, args.baselines, args.threshold, args.update)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
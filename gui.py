@@ -2,10 +2,23 @@ import tkinter as tk
 from tkinter import filedialog, messagebox
 import subprocess
 import os
+import queue
+from concurrent.futures import ThreadPoolExecutor
+from main import dispatch
+from processTable import ProcessTable
 
 # Current working directory
 current_working_dir = os.getcwd()
 
+# Tools and process collection run on worker threads; results come back through this queue
+executor = ThreadPoolExecutor(max_workers=2)
+results = queue.Queue()
+POLL_MS = 100
+
+# Process table state: one collection at a time, tracker lives on the worker side
+table_tracker = None
+table_refreshing = False
+
 # Sorting options
 SORT_OPTIONS = {
     "None": "",
@@ -16,6 +29,36 @@ SORT_OPTIONS = {
     "Sort by Network (-n)": "-n",
 }
 
+def run_in_background(job, on_done):
+    """Run job() on the worker pool and call on_done(result, error) back on the Tk thread."""
+    def task():
+        try:
+            results.put((on_done, job(), None))
+        except Exception as e:
+            results.put((on_done, None, e))
+    executor.submit(task)
+
+def poll_results():
+    """Hand finished background jobs to their callbacks; re-arms itself with after()."""
+    try:
+        while True:
+            on_done, result, error = results.get_nowait()
+            on_done(result, error)
+    except queue.Empty:
+        pass
+    root.after(POLL_MS, poll_results)
+
+def tool_succeeded(command, exit_code, error):
+    """Show an error box for a failed tool run (exception or non-zero exit code); True if it succeeded."""
+    if error:
+        messagebox.showerror("Execution Error", f"An error occurred: {str(error)}")
+        return False
+    if exit_code:
+        messagebox.showerror("Execution Error", f"'{command}' failed with exit code {exit_code}. "
+                                                "The error is printed in the console.")
+        return False
+    return True
+
 def execute_list_windows():
     """Run the List Windows command with selected options."""
     selected_option = sort_var.get()
@@ -32,10 +75,9 @@ def execute_list_windows():
             messagebox.showerror("Input Error", "Please enter a valid number for significant digits.")
             return
 
-    # Run the listWindows.py script with the selected options
-    try:
-        subprocess.run(["python", "listWindows.py"] + additional_args)
-
+    def on_done(result, error):
+        if not tool_succeeded("lw", result, error):
+            return
         # Open output.txt if the checkbox is selected
         if open_output_var.get():
             output_path = os.path.join(current_working_dir, "output.txt")
@@ -43,8 +85,9 @@ def execute_list_windows():
                 subprocess.Popen(["Notepad", output_path], shell=True)  # Open output.txt using Notepad
             else:
                 messagebox.showerror("Error", f"Output file not found at {output_path}")
-    except Exception as e:
-        messagebox.showerror("Execution Error", f"An error occurred: {str(e)}")
+
+    # Run the lw tool on a worker thread; the checkbox above replaces its prompt
+    run_in_background(lambda: dispatch("lw", additional_args + ["--no-prompt"], interactive=False), on_done)
 
 def execute_open_windows():
     """Run the Open Windows command with user inputs."""
@@ -52,9 +95,49 @@ def execute_open_windows():
         filename = input_filename.get()
         num_windows = int(input_num_windows.get())
         viewer = input_viewer.get()
-        subprocess.run(["python", "openwindows.py", filename, str(num_windows), viewer])
-    except Exception as e:
-        messagebox.showerror("Execution Error", f"An error occurred: {str(e)}")
+    except ValueError as e:
+        messagebox.showerror("Input Error", f"An error occurred: {str(e)}")
+        return
+
+    def on_done(result, error):
+        tool_succeeded("ow", result, error)
+
+    run_in_background(lambda: dispatch("ow", [filename, str(num_windows), viewer], interactive=False), on_done)
+
+def refresh_process_table():
+    """Collect a process snapshot on a worker thread and show it in the table."""
+    global table_tracker, table_refreshing
+    if table_refreshing:
+        return
+    table_refreshing = True
+    if table_tracker is None:
+        from processWatch import ProcessTracker
+        table_tracker = ProcessTracker()
+
+    def on_done(rows, error):
+        global table_refreshing
+        table_refreshing = False
+        if error:
+            lbl_table_status.config(text=f"Refresh failed: {error}")
+        else:
+            process_table.set_rows(rows)
+            lbl_table_status.config(text=f"{len(rows)} processes")
+        if auto_refresh_var.get():
+            root.after(refresh_interval_ms(), refresh_process_table)
+
+    run_in_background(table_tracker.sample, on_done)
+
+def refresh_interval_ms():
+    """Auto-refresh interval from the input box, in milliseconds (at least 0.5 s)."""
+    try:
+        return max(500, int(float(input_refresh_interval.get()) * 1000))
+    except ValueError:
+        return 2000
+
+def toggle_auto_refresh():
+    """Start the refresh loop when auto-refresh is switched on."""
+    if auto_refresh_var.get():
+        refresh_process_table()
 
 def update_working_dir():
     """Update the displayed working directory."""
@@ -72,40 +155,47 @@ def change_working_dir():
 
 def exit_program():
     """Exit the program."""
+    executor.shutdown(wait=False)
     root.destroy()
 
 # Initialize main window
 root = tk.Tk()
 root.title("Random Tools GUI")
-root.geometry("500x600")
+root.geometry("1150x720")
+
+# Tool controls on the left, live process table on the right
+controls = tk.Frame(root)
+controls.pack(side="left", fill="y", padx=10)
+table_panel = tk.Frame(root)
+table_panel.pack(side="right", fill="both", expand=True, padx=10)
 
 # Add buttons and inputs
-tk.Label(root, text="Random Tools Manager", font=("Helvetica", 16)).pack(pady=10)
+tk.Label(controls, text="Random Tools Manager", font=("Helvetica", 16)).pack(pady=10)
 
 # Section: Working Directory
-tk.Label(root, text="Manage Working Directory", font=("Helvetica", 14)).pack(pady=10)
-lbl_working_dir = tk.Label(root, text=f"Current Directory: {current_working_dir}", wraplength=400, justify="center")
+tk.Label(controls, text="Manage Working Directory", font=("Helvetica", 14)).pack(pady=10)
+lbl_working_dir = tk.Label(controls, text=f"Current Directory: {current_working_dir}", wraplength=400, justify="center")
 lbl_working_dir.pack(pady=5)
-tk.Button(root, text="Change Working Directory", command=change_working_dir, width=25).pack(pady=5)
+tk.Button(controls, text="Change Working Directory", command=change_working_dir, width=25).pack(pady=5)
 
 # Section: List Windows
-tk.Label(root, text="List Windows", font=("Helvetica", 14)).pack(pady=10)
+tk.Label(controls, text="List Windows", font=("Helvetica", 14)).pack(pady=10)
 
 # Dropdown for sorting options
-tk.Label(root, text="Sorting Options:").pack()
+tk.Label(controls, text="Sorting Options:").pack()
 sort_var = tk.StringVar(root)
 sort_var.set("None")  # Default value
-tk.OptionMenu(root, sort_var, *SORT_OPTIONS.keys()).pack(pady=5)
+tk.OptionMenu(controls, sort_var, *SORT_OPTIONS.keys()).pack(pady=5)
 
 # Significant Digits Options
-tk.Label(root, text="Shorten Significant Digits:").pack()
+tk.Label(controls, text="Shorten Significant Digits:").pack()
 shorten_digits_var = tk.StringVar(root)
 shorten_digits_var.set("No")  # Default value
-tk.OptionMenu(root, shorten_digits_var, "No", "Yes").pack(pady=5)
+tk.OptionMenu(controls, shorten_digits_var, "No", "Yes").pack(pady=5)
 
 # Input for significant digits (hidden by default)
-tk.Label(root, text="Significant Digits:").pack()
-input_significant_digits = tk.Entry(root, width=30)
+tk.Label(controls, text="Significant Digits:").pack()
+input_significant_digits = tk.Entry(controls, width=30)
 input_significant_digits.pack()
 input_significant_digits.config(state="disabled")  # Disable input by default
 
@@ -121,32 +211,51 @@ shorten_digits_var.trace("w", toggle_significant_digits)
 
 # Checkbox for opening output.txt
 open_output_var = tk.BooleanVar()
-open_output_checkbox = tk.Checkbutton(root, text="Open output.txt after completion", variable=open_output_var)
+open_output_checkbox = tk.Checkbutton(controls, text="Open output.txt after completion", variable=open_output_var)
 open_output_checkbox.pack()
 
-tk.Button(root, text="Run List Windows", command=execute_list_windows, width=20).pack(pady=10)
+tk.Button(controls, text="Run List Windows", command=execute_list_windows, width=20).pack(pady=10)
 
 # Section: Open Windows
-tk.Label(root, text="Open Windows", font=("Helvetica", 14)).pack(pady=10)
-tk.Label(root, text="Filename:").pack()
-input_filename = tk.Entry(root, width=30)
+tk.Label(controls, text="Open Windows", font=("Helvetica", 14)).pack(pady=10)
+tk.Label(controls, text="Filename:").pack()
+input_filename = tk.Entry(controls, width=30)
 input_filename.pack()
 
-tk.Label(root, text="Number of Windows:").pack()
-input_num_windows = tk.Entry(root, width=30)
+tk.Label(controls, text="Number of Windows:").pack()
+input_num_windows = tk.Entry(controls, width=30)
 input_num_windows.insert(0, "5")  # Default value
 input_num_windows.pack()
 
-tk.Label(root, text="Viewer:").pack()
-input_viewer = tk.Entry(root, width=30)
+tk.Label(controls, text="Viewer:").pack()
+input_viewer = tk.Entry(controls, width=30)
 input_viewer.insert(0, "Notepad")  # Default viewer
 input_viewer.pack()
 
-tk.Button(root, text="Run Open Windows", command=execute_open_windows, width=20).pack(pady=10)
+tk.Button(controls, text="Run Open Windows", command=execute_open_windows, width=20).pack(pady=10)
 
 # Exit button
-tk.Button(root, text="Exit", command=exit_program, width=10).pack(pady=20)
+tk.Button(controls, text="Exit", command=exit_program, width=10).pack(pady=20)
+
+# Section: Process table
+tk.Label(table_panel, text="Processes", font=("Helvetica", 14)).pack(pady=10)
+table_options = tk.Frame(table_panel)
+table_options.pack(fill="x")
+tk.Button(table_options, text="Refresh", command=refresh_process_table, width=10).pack(side="left")
+auto_refresh_var = tk.BooleanVar()
+tk.Checkbutton(table_options, text="Auto-refresh every", variable=auto_refresh_var,
+               command=toggle_auto_refresh).pack(side="left", padx=5)
+input_refresh_interval = tk.Entry(table_options, width=5)
+input_refresh_interval.insert(0, "2")
+input_refresh_interval.pack(side="left")
+tk.Label(table_options, text="s").pack(side="left")
+lbl_table_status = tk.Label(table_options, text="Click a column heading to sort")
+lbl_table_status.pack(side="right")
+process_table = ProcessTable(table_panel, visible_rows=25)
+process_table.pack(fill="both", expand=True, pady=5)
 
 # Start the GUI event loop
 update_working_dir()  # Initialize the directory display
+poll_results()
+refresh_process_table()  # first snapshot is the baseline for CPU% and IO rates
 root.mainloop()
@@ -1,9 +1,15 @@
+import argparse
 import json
+import os
+import re
 import sys
+import time
 import difflib  # For finding similar command suggestions
+import tracing
+from outputFormats import FORMATS, RecordWriter
 
-# Path to tools.json file
-tools_json_path = 'tools.json'
+# Path to tools.json file (next to this script, so a changed working directory doesn't break it)
+tools_json_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'tools.json')
 
 
 # Load available tools from tools.json
@@ -63,20 +69,42 @@ ERROR_HELP = {
                    "missing colons, or unmatched parentheses.",
     "NameError": "A NameError occurred. This usually means a variable or function is not defined before being used.\n"
                  "Ensure all variables and functions are declared and properly spelled before use.",
+    "AlertError": "An `lw --alert` rule fired and `--alert-exit` stopped the watchdog.\n"
+                  "The message names the rule and the process. Drop `--alert-exit` to keep watching, or use "
+                  "`--on-alert` to run a command instead.",
     "UnboundLocalError": "An UnboundLocalError occurred. This typically happens when a local variable is used before "
                          "being assigned.\n"
                          "Ensure variables are assigned values before using them in expressions."
 }
 
+# One pattern for every exception name: whole identifiers ending in Error/Exception/Warning, plus the
+# ERROR_HELP names that don't (StopIteration). Matching the whole word means "FileNotFoundError" can never
+# be read as a shorter name inside it, whatever order ERROR_HELP lists them in.
+ERROR_SUFFIXES = ('Error', 'Exception', 'Warning')
+ERROR_OTHER_NAMES = sorted((name for name in ERROR_HELP if not name.endswith(ERROR_SUFFIXES)), key=len, reverse=True)
+ERROR_NAME_SOURCE = r'\b(' + '|'.join([r'[A-Z]\w*(?:' + '|'.join(ERROR_SUFFIXES) + ')']
+                                      + [re.escape(name) for name in ERROR_OTHER_NAMES]) + r')\b'
+ERROR_NAME_PATTERN = re.compile(ERROR_NAME_SOURCE)
+ERROR_NAME_BYTES = re.compile(ERROR_NAME_SOURCE.encode())  # --scan matches raw bytes, decoding only hits
+# Literals every match contains; bytes.find() on these is far quicker than running the pattern over clean text
+ERROR_KEYWORDS = tuple(word.encode() for word in ERROR_SUFFIXES + tuple(ERROR_OTHER_NAMES))
+
+# Columns of a --scan result
+SCAN_FIELDS = ('error', 'count', 'first_line', 'last_line', 'help', 'samples')
+SAMPLE_WIDTH = 200
+
 VALID_COMMANDS = ['lw', 'ow', 'help']
 VALID_ARGS = {
-    'lw': ['-p', '-c', '-m', '-d', '-n', '-sd'],
-    'ow': []
+    'lw': ['-p', '-c', '-m', '-d', '-n', '-sd', '-k', '-w', '-i', '--accurate', '--backend', '--record', '--capacity', '--replay', '--since', '--until', '-f', '-o', '--no-prompt', '-g', '--tree', '--cgroups', '--where', '--with-windows', '--with-processes', '--profile', '--serve', '--bind', '--port', '--hosts', '--timeout', '--pid', '--leaks', '--duration', '--alert', '--on-alert', '--alert-exit', '--width', '--title', '--sort-title', '--page', '--page-size'],
+    'ow': ['--manifest', '--timeout', '--profile'],
+    'help': ['--scan', '--samples', '-f']
 }
 
 
 def get_user_confirmation(prompt="View the help page? [y/n]: "):
-    """Prompt the user for a yes/no answer, validating the input."""
+    """Prompt the user for a yes/no answer, validating the input. Without a terminal to ask, the answer is no."""
+    if sys.stdin is None or not sys.stdin.isatty():
+        return False
     while True:
         user_input = input(prompt).strip().lower()
         if user_input in ["y", "n"]:
@@ -109,10 +137,33 @@ def display_help(command=None):
             print("  python main.py lw -m   # List processes ordered by Memory usage")
             print("  python main.py lw -d   # List processes ordered by Disk usage")
             print("  python main.py lw -n   # List processes ordered by Network usage")
+            print("  python main.py lw -m --accurate  # Rank by PSS so shared memory isn't counted once per worker")
             print("  python main.py lw -sd [number] # Specify significant digits for output")
+            print("  python main.py lw -k [number]  # Number of processes to list (default 10)")
+            print("  python main.py lw -w [-i secs] # Live view with CPU% and per-second IO rates")
+            print("  python main.py lw -p --backend proc  # Read /proc directly (Linux, falls back to psutil)")
+            print("  python main.py lw --record [file] [-i secs]  # Append samples to a ring-buffer recording")
+            print("  python main.py lw --replay [file] [--since T1] [--until T2]  # Top processes from a recording")
+            print("  python main.py lw -p -f jsonl -o -  # Stream JSON Lines (or -f csv) to stdout, no prompt")
+            print("  python main.py lw -p -g name|parent|user [--tree]  # Totals per process group")
+            print("  python main.py lw --cgroups [-c|-m|-d]  # Totals per cgroup (container, systemd slice)")
+            print("  python main.py lw -m --where 'name~gunicorn' --where 'rss>500MB'  # Filter processes")
+            print("  python main.py lw -p --with-windows  # Show the windows each top process owns")
+            print("  python main.py lw --with-processes   # Show the owning process, CPU and memory of each window")
+            print("  python main.py lw --title chrome --sort-title [--width 120] [--page-size 50 --page 2]  # Window matrix")
+            print("  python main.py lw -p --profile [file.json|file.prof]  # Phase timings and skip counts")
+            print("  python main.py lw --pid [pid] [-i secs] [-k threads]  # Drill into one process and its threads")
+            print("  python main.py lw --leaks [--duration 1h] [-i secs] [--accurate]  # Rank processes by steady memory growth")
+            print("  python main.py lw --alert 'cpu>90 for 30s' [--on-alert CMD] [--alert-exit]  # Watchdog")
+            print("  python main.py lw --serve [--bind 0.0.0.0] [--port 8765] [-i secs]  # Serve snapshots to --hosts")
+            print("  python main.py lw -c --hosts web1,web2:9000 [--timeout secs]  # Global top N across agents")
         elif command == "ow":
             print("  python main.py ow [filename] [num_windows] [viewer]  # Open file with viewer in multiple windows")
+            print("  python main.py ow --manifest [file.json]  # Open several files listed in a JSON manifest")
             print("Example:\n  python main.py ow output.txt 4 Notepad")
+        elif command == "help":
+            print("  python main.py help \"<error message>\"  # Advice for an error")
+            print("  python main.py help --scan [logfile|-] [--samples N] [-f text|jsonl|csv]  # Count the errors in a log")
         else:
             print("  Refer to tools.json for additional details.")
 
@@ -124,26 +175,151 @@ def suggest_correction(argument, command):
         print(f"Did you mean '{suggestions[0]}' instead of '{argument}'?")
 
 
+# Function to find the first exception name in a message that has a help entry
+def classify_error(error_message):
+    for match in ERROR_NAME_PATTERN.finditer(error_message):
+        if match.group(1) in ERROR_HELP:
+            return match.group(1)
+    return None
+
+
 def handle_error(error_message):
     # Analyze the error and offer help if available
-    for error_type, help_message in ERROR_HELP.items():
-        if error_type in error_message:
-            print(f"\nError Detected: {error_type}")
-            print(help_message)
-            if get_user_confirmation("\nView the help page? [y/n]: "):
-                display_help()  # Show general help
-            return
+    with tracing.phase('help.classify'):
+        matched = classify_error(error_message)
+    tracing.count(f"help.errors.{matched or 'unmatched'}")
 
-    print("Error: No specific help available for this error.")
-    if get_user_confirmation("Would you like to see the general help page? [y/n]: "):
-        display_help()
+    if matched:
+        print(f"\nError Detected: {matched}")
+        print(ERROR_HELP[matched])
+        with tracing.phase('prompt'):
+            show_help = get_user_confirmation("\nView the help page? [y/n]: ")
+    else:
+        print("Error: No specific help available for this error.")
+        with tracing.phase('prompt'):
+            show_help = get_user_confirmation("Would you like to see the general help page? [y/n]: ")
+    if show_help:
+        display_help()  # Show general help
 
 
-if __name__ == "__main__":
+def scan_log(stream, samples=3, block_size=1 << 20):
+    """Count the exception names in a binary stream, keeping only per-type totals and a few samples.
+
+    The stream is read in fixed-size blocks. Each block is searched for the literal
+    keywords, and only lines containing one are located, numbered and matched against
+    the full pattern, so memory stays constant and clean lines cost no Python code at all.
+    Returns (lines, {name: [count, first_line, last_line, [(line_number, text), ...]]}).
+    """
+    search = ERROR_NAME_BYTES.search
+    stats = {}
+    lines = 0
+    carry = b""
+    while True:
+        block = stream.read(block_size)
+        if not block:
+            if not carry:
+                break
+            block, carry = carry + b"\n", b""  # last line had no newline
+        else:
+            block = carry + block
+            end = block.rfind(b"\n") + 1
+            if end == 0:
+                carry = block  # a single line longer than the block; keep reading
+                continue
+            block, carry = block[:end], block[end:]
+
+        # Jump between keyword hits; the full pattern only runs on the lines they land in
+        upcoming = [block.find(keyword) for keyword in ERROR_KEYWORDS]
+        counted = 0
+        while True:
+            hit = min((position for position in upcoming if position >= 0), default=-1)
+            if hit < 0:
+                break
+            line_start = block.rfind(b"\n", 0, hit) + 1
+            line_end = block.find(b"\n", hit)
+            match = search(block, line_start, line_end)
+            if match is not None:
+                lines += block.count(b"\n", counted, line_start)
+                counted = line_start
+                number = lines + 1
+
+                name = match.group(1)
+                entry = stats.get(name)
+                if entry is None:
+                    entry = stats[name] = [0, number, number, []]
+                entry[0] += 1
+                entry[2] = number
+                if len(entry[3]) < samples:
+                    text = block[line_start:min(line_end, line_start + SAMPLE_WIDTH)].rstrip()
+                    entry[3].append((number, text.decode('utf-8', errors='replace')))
+            # One classification per line (the first name on it), so continue on the next line
+            for index, position in enumerate(upcoming):
+                if 0 <= position <= line_end:
+                    upcoming[index] = block.find(ERROR_KEYWORDS[index], line_end + 1)
+        lines += block.count(b"\n", counted)
+    return lines, {name.decode('ascii'): entry for name, entry in stats.items()}
+
+
+# Function to scan a log file (or '-' for stdin) and print a summary per exception type
+def scan_main(argv):
+    parser = argparse.ArgumentParser(prog="help", description="Summarize the errors in a log file.")
+    parser.add_argument('--scan', required=True, metavar='LOGFILE', help="Log file to scan, or '-' for stdin.")
+    parser.add_argument('--samples', type=int, default=3, help="Sample lines kept per error type (default is 3).")
+    parser.add_argument('-f', '--format', choices=FORMATS, default='text', help="Output format (default is text).")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    with tracing.phase('help.scan'):
+        if args.scan == '-':
+            lines, stats = scan_log(sys.stdin.buffer, args.samples)
+        else:
+            try:
+                f = open(args.scan, 'rb')
+            except OSError as e:
+                parser.error(f"can't read {args.scan}: {e.strerror}")
+            with f:
+                lines, stats = scan_log(f, args.samples)
+    elapsed = time.perf_counter() - start
+    tracing.count('help.scan.lines', lines)
+
+    records = [{'error': name, 'count': count, 'first_line': first, 'last_line': last,
+                'help': name in ERROR_HELP, 'samples': [text for _, text in kept]}
+               for name, (count, first, last, kept) in sorted(stats.items(), key=lambda item: -item[1][0])]
+
+    def render(record):
+        text = (f"{record['error']}: {record['count']:,} line(s), first at line {record['first_line']:,}, "
+                f"last at line {record['last_line']:,}" + (" (help available)" if record['help'] else ""))
+        for (number, _), sample in zip(stats[record['error']][3], record['samples']):
+            text += f"\n    {number}: {sample}"
+        return text
+
+    if args.format == 'text':
+        print(f"Scanned {lines:,} lines in {elapsed:.2f}s: {sum(r['count'] for r in records):,} mention an error "
+              f"({len(records)} type(s))\n")
+    RecordWriter(sys.stdout, args.format, SCAN_FIELDS, render_text=render).write_all(records)
+    if args.format == 'text' and any(record['help'] for record in records):
+        print("\nRun `python main.py help \"<ErrorName>\"` for advice on a specific error.")
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
     # Get error message passed in from other scripts (if any)
-    error_message = sys.argv[1] if len(sys.argv) > 1 else ""
-    if error_message:
-        handle_error(error_message)
-    else:
-        # Show general help if no error message is passed
-        display_help()
+    error_message = argv[0] if argv else ""
+    with tracing.session():
+        # Scan options can come in any order (`help --samples 1 --scan log`), so look at every argument
+        if any(arg == '--scan' or arg.startswith('--scan=') for arg in argv):
+            scan_main(argv)
+        elif error_message in load_tools():
+            # `help lw`: usage for that command rather than advice for an error
+            with tracing.phase('help.render'):
+                display_help(error_message)
+        elif error_message:
+            handle_error(error_message)
+        else:
+            # Show general help if no error message is passed
+            with tracing.phase('help.render'):
+                display_help()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,100 +1,669 @@
+import heapq
+import itertools
 import math
 import os
-import pygetwindow as gw
+import re
+import shutil
 import psutil
 import argparse
+import datetime
 import subprocess
+import sys
+import time
+import tracing
+from outputFormats import FORMATS, PROCESS_FIELDS, WINDOW_FIELDS, WINDOW_PROCESS_FIELDS, RecordWriter, open_output
+
+# Function to build the window index once per run; both the window and process listings share it
+def build_window_index():
+    from windowIndex import WindowIndex
+
+    with tracing.phase('windows.list'):
+        index = WindowIndex()
+        index.refresh()
+    tracing.count('windows.listed', len(index.windows))
+    return index
 
 # Function to count and list open windows
-def count_open_windows():
-    windows = gw.getAllTitles()
-    open_windows = [win for win in windows if win.strip()]
-    return open_windows
+def count_open_windows(index=None):
+    if index is None:
+        index = build_window_index()
+    return index.titles()
+
+# Function to sample a handful of pids, priming cpu_percent so the reading isn't the first-call 0.0
+def sample_processes(pids, fields=('cpu_percent', 'memory_percent'), interval=0.1):
+    procs = {}
+    for pid in pids:
+        try:
+            proc = psutil.Process(pid)
+            proc.cpu_percent(interval=None)
+            procs[pid] = proc
+        except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess) as e:
+            tracing.skipped('windows.sample', e)
+    if procs and 'cpu_percent' in fields:
+        time.sleep(interval)
+
+    samples = {}
+    for pid, proc in procs.items():
+        try:
+            row = {'pid': pid, 'name': proc.name()}
+            row.update(collect_metrics(proc, fields))
+            samples[pid] = row
+        except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess) as e:
+            tracing.skipped('windows.sample', e)
+    return samples
+
+# Function to join every window with the CPU and memory of the process that owns it
+def join_window_processes(index):
+    with tracing.phase('windows.sample'):
+        samples = sample_processes(index.pids())
+    records = []
+    for entry in index.windows.values():
+        proc = samples.get(entry['pid'], {})
+        records.append({
+            'title': entry['title'],
+            'pid': entry['pid'],
+            'name': proc.get('name'),
+            'cpu_percent': proc.get('cpu_percent'),
+            'memory_percent': proc.get('memory_percent'),
+        })
+    return records
 
-# Function to print the matrix of open windows
-def print_matrix_windows(windows, output_file="output.txt"):
+# Function to label a joined window record for the matrix
+def format_window_cell(record):
+    if record['name'] is None:
+        return f"{record['title']} [PID {record['pid']}]"
+    return (f"{record['title']} [{record['name']} {record['pid']}, CPU {record['cpu_percent']:.1f}%, "
+            f"Mem {record['memory_percent']:.1f}%]")
+
+# Function to narrow the window list by title, sort it and cut out one page
+def select_windows(windows, title_pattern=None, sort_title=False, page=1, page_size=0):
+    title = (lambda win: win['title']) if windows and isinstance(windows[0], dict) else (lambda win: win)
+    if title_pattern:
+        pattern = re.compile(title_pattern, re.IGNORECASE)
+        windows = [win for win in windows if pattern.search(title(win))]
+    if sort_title:
+        windows = sorted(windows, key=lambda win: title(win).casefold())
+    if page_size:
+        windows = windows[(page - 1) * page_size:page * page_size]
+    return windows
+
+# Function to print the matrix of open windows (titles, or joined window records)
+def print_matrix_windows(windows, output_file="output.txt", output_format='text', prompt=True, width=None):
+    joined = bool(windows) and isinstance(windows[0], dict)
+    with open_output(output_file, output_format) as stream:
+        if output_format != 'text':
+            with tracing.phase('output.write'):
+                if joined:
+                    RecordWriter(stream, output_format, WINDOW_PROCESS_FIELDS).write_all(windows)
+                else:
+                    RecordWriter(stream, output_format, WINDOW_FIELDS).write_all({'title': win} for win in windows)
+        else:
+            with tracing.phase('output.write'):
+                write_matrix(stream, [format_window_cell(win) for win in windows] if joined else windows, width)
+    finish_output(output_file, "Matrix of windows", prompt)
+
+# Narrowest a column is squeezed to before titles are cut, and the marker for a cut title
+MIN_CELL = 12
+ELLIPSIS = "..."
+
+# Function to shrink column widths to fit `available` characters: the widest columns are capped first
+def fit_widths(widths, available):
+    if sum(widths) <= available:
+        return widths
+    # Find the largest cap c with sum(min(w, c)) <= available; narrow columns keep their own width
+    remaining = available
+    ordered = sorted(widths)
+    cap = MIN_CELL
+    for index, natural in enumerate(ordered):
+        share = remaining // (len(ordered) - index)
+        if natural > share:
+            cap = max(share, MIN_CELL)
+            break
+        remaining -= natural
+    return [min(natural, cap) for natural in widths]
+
+# Function to write the window matrix row by row, each column as wide as its longest title.
+# `width` caps the whole line (default is the terminal width; 0 means no limit).
+def write_matrix(stream, windows, width=None):
     num_windows = len(windows)
     if num_windows == 0:
-        output_str = "No Open Windows :3\n"
-    else:
-        max_length = max(len(win) for win in windows)
-        half_length = max_length // 2
-        cols = math.ceil(math.sqrt(num_windows))
-        rows = math.ceil(num_windows / cols)
-
-        separator = "+-" + ("-" * half_length) + "|" + ("-" * half_length) + "-+"
-        output_str = f"{separator * cols}\n"
-
-        for i in range(rows):
-            row_str = ""
-            for j in range(cols):
-                index = i * cols + j
-                if index < num_windows:
-                    row_str += f"{windows[index]:<{max_length + 4}}"
-            output_str += row_str + "\n"
-            output_str += f"{separator * cols}\n"
-
-    with open(output_file, 'w') as f:
-        f.write(output_str)
-    print(f"Matrix of windows written to {output_file}")
-    prompt_open_file(output_file)
-
-# Function to get top 10 processes
-def get_top_processes(order_by=None):
-    processes = []
-    for proc in psutil.process_iter(['pid', 'name']):
+        stream.write("No Open Windows :3\n")
+        return
+    if width is None:
+        width = shutil.get_terminal_size((160, 24)).columns
+
+    cols = math.ceil(math.sqrt(num_windows))
+    if width:
+        cols = max(1, min(cols, (width - 1) // (MIN_CELL + 3)))  # "| " + cell + " " per column, plus the last "|"
+    rows = math.ceil(num_windows / cols)
+
+    widths = [max(map(len, windows[column::cols])) for column in range(cols)]
+    if width:
+        widths = fit_widths(widths, width - 1 - 3 * cols)
+
+    separator_line = "+" + "+".join("-" * (cell + 2) for cell in widths) + "+\n"
+    stream.write(separator_line)
+    for i in range(rows):
+        cells = [(win if len(win) <= cell else clip_title(win, cell)).ljust(cell)
+                 for win, cell in zip(windows[i * cols:(i + 1) * cols], widths)]
+        cells.extend(" " * cell for cell in widths[len(cells):])
+        stream.write("| " + " | ".join(cells) + " |\n")
+        stream.write(separator_line)
+
+# Function to cut a title to `cell` characters, marking the cut
+def clip_title(title, cell):
+    if cell > len(ELLIPSIS):
+        return title[:cell - len(ELLIPSIS)] + ELLIPSIS
+    return title[:cell]
+
+# Function to report where output went and offer to open it
+def finish_output(output_file, description, prompt=True):
+    if output_file == '-':
+        return
+    print(f"{description} written to {output_file}")
+    if prompt:
+        with tracing.phase('prompt'):
+            prompt_open_file(output_file)
+
+# Columns of a --replay result
+REPLAY_FIELDS = ('pid', 'samples', 'cpu_percent', 'peak_rss', 'disk_usage', 'first_seen', 'last_seen')
+
+# Metric recorded for each order_by option
+ORDER_FIELDS = {
+    'cpu': 'cpu_percent',
+    'memory': 'memory_percent',
+    'disk': 'disk_usage',
+    'network': 'net_usage',
+}
+METRIC_FIELDS = ('cpu_percent', 'memory_percent', 'disk_usage', 'net_usage')
+
+# Function to fetch only the requested metrics for one process
+def collect_metrics(proc, fields):
+    metrics = {}
+    with proc.oneshot():
+        if 'cpu_percent' in fields:
+            metrics['cpu_percent'] = proc.cpu_percent(interval=None)
+        if 'memory_percent' in fields:
+            metrics['memory_percent'] = proc.memory_percent()
+        if 'rss' in fields:
+            metrics['rss'] = proc.memory_info().rss
+        if 'disk_usage' in fields or 'net_usage' in fields:
+            try:
+                io_counters = proc.io_counters()  # one call serves both disk and network
+            except psutil.AccessDenied:
+                io_counters = None  # other users' IO is admin-only; count it as zero rather than drop the process
+                tracing.count('processes.io_denied')
+            if 'disk_usage' in fields:
+                metrics['disk_usage'] = io_counters.read_bytes + io_counters.write_bytes if io_counters else 0
+            if 'net_usage' in fields:
+                metrics['net_usage'] = io_counters.read_count + io_counters.write_count if io_counters else 0
+    return metrics
+
+# Function to walk the process table once, yielding (row, proc) with the requested metrics filled in.
+# A --where filter is pushed down: cheap checks run first and only survivors get their metrics fetched.
+def snapshot_processes(fields, attrs=(), where=None):
+    if where is not None:
+        attrs = tuple(attrs) + tuple(attr for attr in where.prefetch if attr not in attrs)
+        fields = tuple(fields) + tuple(field for field in where.metric_fields if field not in fields)
+    traced = tracing.TRACER.enabled  # checked once; this loop runs for every process
+    for proc in psutil.process_iter(['pid', 'name', *attrs]):
+        if traced:
+            tracing.count('processes.seen')
         try:
-            cpu_percent = proc.cpu_percent(interval=None)
-            memory_percent = proc.memory_percent()
-            io_counters = proc.io_counters() if proc.io_counters() else None
-            disk_usage = io_counters.read_bytes + io_counters.write_bytes if io_counters else 0
-            net_usage = io_counters.read_count + io_counters.write_count if io_counters else 0
-
-            processes.append({
-                'pid': proc.pid,
-                'name': proc.name(),
-                'cpu_percent': cpu_percent,
-                'memory_percent': memory_percent,
-                'disk_usage': disk_usage,
-                'net_usage': net_usage
-            })
-        except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
-            pass
-
-    if order_by == 'cpu':
-        processes.sort(key=lambda p: p['cpu_percent'], reverse=True)
-    elif order_by == 'memory':
-        processes.sort(key=lambda p: p['memory_percent'], reverse=True)
-    elif order_by == 'disk':
-        processes.sort(key=lambda p: p['disk_usage'], reverse=True)
-    elif order_by == 'network':
-        processes.sort(key=lambda p: p['net_usage'], reverse=True)
-
-    return processes[:10]
+            row = {'pid': proc.pid, 'name': proc.info['name']}
+            for attr in attrs:
+                row[attr] = proc.info[attr]
+            if where is not None:
+                if not where.accepts(row, 'cheap'):
+                    tracing.count('processes.filtered')
+                    continue
+                if where.needs_user and 'username' not in row:
+                    row['username'] = proc.username()
+                if not where.accepts(row, 'lookup'):
+                    tracing.count('processes.filtered')
+                    continue
+            if traced:
+                with tracing.phase('processes.fetch'):
+                    row.update(collect_metrics(proc, fields))
+            else:
+                row.update(collect_metrics(proc, fields))
+            if where is not None and not where.accepts(row, 'expensive'):
+                tracing.count('processes.filtered')
+                continue
+            yield row, proc
+        except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess) as e:
+            tracing.skipped('processes', e)
+
+# --accurate: how many RSS leaders (per requested row) get their PSS read, and the reader threads
+ACCURATE_FACTOR = 3
+ACCURATE_MIN_CANDIDATES = 20
+ACCURATE_WORKERS = 8
+ACCURATE_FIELDS = PROCESS_FIELDS + ('rss', 'pss', 'uss')
+
+# Function to read USS and PSS (PSS is Linux-only; elsewhere USS stands in for it)
+def read_full_memory(proc):
+    try:
+        info = proc.memory_full_info()
+    except (psutil.NoSuchProcess, psutil.ZombieProcess, psutil.AccessDenied) as e:
+        tracing.skipped('processes.accurate', e)
+        return None, None
+    return getattr(info, 'pss', info.uss), info.uss
+
+# Function to rank by real memory use in two stages: RSS picks the candidates cheaply, then only
+# those get their smaps read (in a thread pool) and are re-ranked by PSS
+def get_accurate_memory(top=10, where=None):
+    from concurrent.futures import ThreadPoolExecutor
+
+    with tracing.phase('processes.scan'):
+        candidates = heapq.nlargest(max(top * ACCURATE_FACTOR, ACCURATE_MIN_CANDIDATES),
+                                    snapshot_processes(('rss',), where=where), key=lambda item: item[0]['rss'])
+    with tracing.phase('processes.smaps'), ThreadPoolExecutor(ACCURATE_WORKERS) as pool:
+        full = list(pool.map(read_full_memory, [proc for _, proc in candidates]))
+    tracing.count('processes.smaps_read', len(candidates))
+
+    for (row, _), (pss, uss) in zip(candidates, full):
+        row['pss'], row['uss'] = pss, uss
+    # Processes we may not read keep their RSS as the best estimate
+    winners = heapq.nlargest(top, candidates, key=lambda item: item[0]['pss'] if item[0]['pss'] is not None
+                             else item[0]['rss'])
+
+    processes = []
+    with tracing.phase('processes.fill'):
+        for row, proc in winners:
+            try:
+                row.update(collect_metrics(proc, METRIC_FIELDS))
+                processes.append(row)
+            except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess) as e:
+                tracing.skipped('processes.fill', e)
+    return processes
+
+# Function to get the top N processes
+def get_top_processes(order_by=None, top=10, backend='psutil', where=None, accurate=False):
+    sort_field = ORDER_FIELDS.get(order_by)
+    if accurate:
+        return get_accurate_memory(top, where)
+
+    # Native /proc backend on Linux; anything else (or a locked-down /proc, or a filter) uses psutil below
+    if backend == 'proc' and where is None:
+        import procBackend
+        if procBackend.available():
+            try:
+                with tracing.phase('processes.proc_backend'):
+                    return procBackend.ProcBackend().top_processes(sort_field, top)
+            except PermissionError as e:
+                tracing.skipped('processes.proc_backend', e)
+
+    # Unordered: the first N processes are the answer, so stop enumerating there
+    if sort_field is None:
+        with tracing.phase('processes.scan'):
+            return [row for row, _ in itertools.islice(snapshot_processes(METRIC_FIELDS, where=where), top)]
+
+    # Ordered: fetch just the sort key for every process and keep the N largest in a bounded heap
+    with tracing.phase('processes.scan'):
+        winners = heapq.nlargest(top, snapshot_processes((sort_field,), where=where),
+                                 key=lambda item: item[0][sort_field])
+
+    # Fill in the remaining columns for the winners only (a filter may already have fetched some)
+    processes = []
+    with tracing.phase('processes.fill'):
+        for row, proc in winners:
+            try:
+                row.update(collect_metrics(proc, tuple(field for field in METRIC_FIELDS if field not in row)))
+                processes.append(row)
+            except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess) as e:
+                tracing.skipped('processes.fill', e)
+    return processes
+
+# Function to format the metric columns of a process or group row with optional digit formatting
+def format_metrics(proc, significant_digits=None, rate=False):
+    per_second = "/s" if rate else ""
+    cpu_display = f"{proc['cpu_percent']:.{significant_digits}f}" if significant_digits else f"{proc['cpu_percent']}"
+    memory_display = f"{proc['memory_percent']:.{significant_digits}f}%" if significant_digits else f"{proc['memory_percent']}%"
+    disk_display = f"{proc['disk_usage'] / (10 ** (len(str(int(proc['disk_usage']))) - significant_digits)):.{significant_digits}f}" if significant_digits else f"{proc['disk_usage']:,}"
+    net_display = f"{proc['net_usage'] / (10 ** (len(str(int(proc['net_usage']))) - significant_digits)):.{significant_digits}f}" if significant_digits else f"{proc['net_usage']:,}"
+
+    return (f"CPU: {cpu_display}%, Memory: {memory_display}, Disk Usage: {disk_display} bytes{per_second}, "
+            f"Net Usage: {net_display} counts{per_second}")
+
+# Function to format one process row
+def format_process_line(proc, significant_digits=None, rate=False):
+    return f"PID: {proc['pid']}, Name: {proc['name']}, " + format_metrics(proc, significant_digits, rate)
 
 # Display top processes with optional digit formatting
-def display_top_processes(order_by=None, significant_digits=None, output_file="output.txt"):
-    windows = gw.getAllTitles()
-    max_length = max(len(win) for win in windows)
-    output_str = f"\nTop 10 Processes (ordered by {order_by if order_by else 'default'}):\n"
-    processes = get_top_processes(order_by)
-
-    for proc in processes:
-        memory_display = f"{proc['memory_percent']:.{significant_digits}f}%" if significant_digits else f"{proc['memory_percent']}%"
-        disk_display = f"{proc['disk_usage'] / (10 ** (len(str(proc['disk_usage'])) - significant_digits)):.{significant_digits}f}" if significant_digits else f"{proc['disk_usage']:,} bytes"
-        net_display = f"{proc['net_usage'] / (10 ** (len(str(proc['net_usage'])) - significant_digits)):.{significant_digits}f}" if significant_digits else f"{proc['net_usage']:,} "
-
-        output_str += (f"PID: {proc['pid']}, Name: {proc['name']}, CPU: {proc['cpu_percent']}%, "
-                    f"Memory: {memory_display}, Disk Usage: {disk_display} bytes, "
-                    f"Net Usage: {net_display} counts\n")
-
-    with open(output_file, 'w') as f:
-        f.write(output_str)
-    print(f"Process information written to {output_file}")
-    prompt_open_file(output_file)
+def display_top_processes(order_by=None, significant_digits=None, output_file="output.txt", top=10, backend='psutil',
+                          output_format='text', prompt=True, where=None, windows=None, accurate=False):
+    processes = get_top_processes(order_by, top, backend, where, accurate)
+    fieldnames = ACCURATE_FIELDS if accurate else PROCESS_FIELDS
+
+    # Join with the window index: each process lists the windows it owns
+    if windows is not None:
+        fieldnames = fieldnames + ('windows',)
+        for proc in processes:
+            proc['windows'] = [entry['title'] for entry in windows.for_pid(proc['pid'])]
+
+    def render(proc):
+        with tracing.phase('output.format'):
+            line = format_process_line(proc, significant_digits)
+            if accurate:
+                line += f", RSS: {proc['rss']:,} bytes"
+                for label, key in (('PSS', 'pss'), ('USS', 'uss')):
+                    line += f", {label}: " + (f"{proc[key]:,} bytes" if proc[key] is not None else "n/a")
+            for title in proc.get('windows', ()):
+                line += f"\n    └─ Window: {title}"
+        return line
+
+    with open_output(output_file, output_format) as stream, tracing.phase('output.write'):
+        if output_format == 'text':
+            ordering = "memory, by PSS" if accurate else order_by if order_by else 'default'
+            stream.write(f"\nTop {top} Processes (ordered by {ordering}):\n")
+        writer = RecordWriter(stream, output_format, fieldnames, significant_digits, render)
+        writer.write_all(processes)
+    finish_output(output_file, "Process information", prompt)
+
+# Display process groups (by name, parent or user) with aggregated totals, optionally as a tree
+def display_grouped_processes(group_by, order_by=None, significant_digits=None, output_file="output.txt", top=10,
+                              output_format='text', prompt=True, tree=False, where=None):
+    from processGroups import GROUP_FIELDS, GroupIndex
+
+    sort_field = ORDER_FIELDS.get(order_by)
+    attrs = {'parent': ('ppid',), 'user': ('username',)}.get(group_by, ())
+    if tree:
+        attrs = ('ppid',) + tuple(attr for attr in attrs if attr != 'ppid')
+    with tracing.phase('processes.scan'):
+        index = GroupIndex(group_by).add_all(row for row, _ in snapshot_processes(METRIC_FIELDS, attrs, where))
+    with tracing.phase('groups.rank'):
+        groups = index.top(sort_field, top)
+
+    def render(group):
+        line = f"Group: {group['group']}, Processes: {group['processes']}, " + format_metrics(group, significant_digits)
+        if tree:
+            for depth, proc in index.expand(group, sort_field):
+                line += "\n" + "    " * depth + "└─ " + format_process_line(proc, significant_digits)
+        return line
+
+    with open_output(output_file, output_format) as stream:
+        if output_format == 'text':
+            stream.write(f"\nTop {top} Groups by {group_by} (ordered by {order_by if order_by else 'process count'}):\n")
+        with tracing.phase('output.write'):
+            RecordWriter(stream, output_format, GROUP_FIELDS, significant_digits, render).write_all(groups)
+    finish_output(output_file, "Process groups", prompt)
+
+# Rank cgroups (containers, systemd slices) by the totals the kernel keeps for them
+def display_cgroups(order_by=None, significant_digits=None, output_file="output.txt", top=10, output_format='text',
+                    prompt=True, cgroup_root=None):
+    from processCgroups import CGROUP_FIELDS, SORT_FIELDS, CgroupReader
+
+    groups = CgroupReader(cgroup_root).top(SORT_FIELDS.get(order_by), top)
+
+    def render(group):
+        def optional(value, fmt):
+            return "n/a" if value is None else fmt.format(value)
+        cpu = f"{{:.{significant_digits}f}}%" if significant_digits else "{:.1f}%"
+        return (f"Cgroup: {group['cgroup']}, Processes: {group['processes']}, "
+                f"CPU: {optional(group['cpu_percent'], cpu)}, Memory: {optional(group['memory'], '{:,} bytes')}, "
+                f"Disk: {optional(group['disk_usage'], '{:,.0f} bytes/s')}")
+
+    with open_output(output_file, output_format) as stream:
+        if output_format == 'text':
+            stream.write(f"\nTop {top} Cgroups (ordered by {order_by if order_by else 'process count'}):\n")
+        with tracing.phase('output.write'):
+            RecordWriter(stream, output_format, CGROUP_FIELDS, significant_digits, render).write_all(groups)
+    finish_output(output_file, "Cgroup totals", prompt)
+
+# Live top-like view: CPU% and IO rates come from deltas between ticks, redrawn in place
+# (or, for jsonl/csv, appended as timestamped records every tick)
+def watch_processes(order_by=None, significant_digits=None, top=10, interval=2.0, output_file='-', output_format='text'):
+    from processWatch import ProcessTracker
+
+    order_by = order_by or 'cpu'
+    sort_field = ORDER_FIELDS[order_by]
+    if significant_digits is None:
+        significant_digits = 2  # rates are floats; keep the live view readable
+    tracker = ProcessTracker()
+    tracker.sample()  # baseline tick, every rate would read 0 otherwise
+
+    with open_output(output_file, output_format) as stream:
+        writer = RecordWriter(stream, output_format, ('timestamp',) + PROCESS_FIELDS, significant_digits,
+                              lambda proc: format_process_line(proc, significant_digits, rate=True))
+        try:
+            while True:
+                time.sleep(interval)
+                processes = tracker.top(sort_field, top)
+                if output_format == 'text':
+                    stream.write("\033[H\033[2J")  # cursor home + clear screen
+                    stream.write(f"Top {top} Processes (ordered by {order_by}, every {interval}s, "
+                                 f"{len(tracker.tracked)} tracked) - Ctrl+C to stop\n")
+                now = time.time()
+                for proc in processes:
+                    proc['timestamp'] = now
+                    writer.write(proc)
+                stream.flush()
+        except KeyboardInterrupt:
+            print()
+
+# Drill into one process: summary rates and its busiest threads every interval. On a terminal only the
+# lines that changed are rewritten; jsonl/csv get a record for each thread whose CPU usage changed.
+def drill_process(pid, interval=2.0, top=10, significant_digits=None, output_file='-', output_format='text'):
+    from processDetail import THREAD_FIELDS, ProcessSampler, ScreenDiff, render_frame
+
+    sampler = ProcessSampler(pid)
+    sampler.sample()  # baseline tick, every rate would read 0 otherwise
+
+    with open_output(output_file, output_format) as stream:
+        writer = RecordWriter(stream, output_format, THREAD_FIELDS, significant_digits)
+        screen = ScreenDiff(stream) if output_format == 'text' and stream.isatty() else None
+        try:
+            while True:
+                time.sleep(interval)
+                try:
+                    summary, changed, _ = sampler.sample()
+                except psutil.NoSuchProcess:
+                    print(f"Process {pid} exited", file=sys.stderr)
+                    return
+                with tracing.phase('detail.render'):
+                    if output_format != 'text':
+                        now = time.time()
+                        for state in changed:
+                            writer.write({'timestamp': now, 'pid': pid, 'tid': state.tid, 'name': state.name,
+                                          'cpu_percent': state.cpu_percent, 'cpu_time': state.cpu_time})
+                        stream.flush()
+                        continue
+                    rows = top
+                    if screen:
+                        rows = min(top, max(shutil.get_terminal_size().lines - 6, 1))
+                    lines = render_frame(summary, sampler.top_threads(rows), interval)
+                    if screen:
+                        screen.update(lines)
+                    else:
+                        stream.write("\n".join(lines) + "\n\n")
+                        stream.flush()
+        except KeyboardInterrupt:
+            print()
+
+# Function to read (pid, create_time, name, memory) for every process through the usual snapshot walk;
+# with accurate, USS replaces RSS and processes whose USS can't be read are left out
+def sample_leak_memory(where=None, accurate=False):
+    for row, proc in snapshot_processes(('rss',), attrs=('create_time',), where=where):
+        memory = row['rss']
+        if accurate:
+            _, memory = read_full_memory(proc)
+            if memory is None:
+                continue
+        yield row['pid'], row['create_time'], row['name'], memory
+
+# Sample memory every interval for `duration` seconds (or until Ctrl+C), then list the processes whose
+# memory grew the most steadily
+def find_leaks(duration, interval=2.0, top=10, where=None, accurate=False, significant_digits=None,
+               output_file='-', output_format='text'):
+    from processLeaks import LEAK_FIELDS, LeakDetector
+
+    detector = LeakDetector()
+    metric = "USS" if accurate else "RSS"
+    print(f"Sampling the {metric} of every process every {interval}s for {duration:g}s (Ctrl+C to stop early)",
+          file=sys.stderr)
+    deadline = time.monotonic() + duration
+    try:
+        while True:
+            with tracing.phase('leaks.sample'):
+                detector.update(sample_leak_memory(where, accurate), time.monotonic())
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            time.sleep(min(interval, remaining))
+    except KeyboardInterrupt:
+        print()
+    with tracing.phase('leaks.rank'):
+        processes = detector.top(top)
+
+    digits = significant_digits if significant_digits is not None else 2
+    def render(proc):
+        return (f"PID: {proc['pid']}, Name: {proc['name']}, {metric}: {proc['memory']:,} bytes, "
+                f"Growth: {proc['growth']:,.0f} bytes/h (at least {proc['growth_low']:,.0f}), "
+                f"R²: {proc['r2']:.{digits}f}, Samples: {proc['samples']}")
+
+    with open_output(output_file, output_format) as stream:
+        if output_format == 'text':
+            stream.write(f"\nTop {top} Processes by sustained {metric} growth "
+                         f"({len(detector.stats)} tracked):\n")
+            if not processes:
+                stream.write("No process grew steadily enough to stand out.\n")
+        RecordWriter(stream, output_format, LEAK_FIELDS, significant_digits, render).write_all(processes)
+    finish_output(output_file, "Leak report", prompt=False)
+
+# Serve the process snapshot to `lw --hosts` over HTTP, refreshed every interval
+def serve_processes(bind='127.0.0.1', port=None, interval=2.0, where=None):
+    import processAgent
+
+    def collect():
+        return [row for row, _ in snapshot_processes(METRIC_FIELDS, where=where)]
+
+    processAgent.serve(collect, bind, port or processAgent.DEFAULT_PORT, interval)
+
+# Query several agents at once and show the global top N across all of them
+def display_host_processes(hosts, order_by=None, significant_digits=None, output_file="output.txt", top=10,
+                           timeout=2.0, output_format='text', prompt=True):
+    import processAgent
+
+    order_by = order_by or 'cpu'
+    processes, failures = processAgent.query_hosts(hosts, ORDER_FIELDS[order_by], top, timeout)
+    for host, reason in failures:
+        print(f"Warning: no answer from {host}: {reason}", file=sys.stderr)
+    if len(failures) == len(hosts):
+        raise ConnectionError(f"none of the {len(hosts)} host(s) answered")
+
+    with open_output(output_file, output_format) as stream:
+        if output_format == 'text':
+            stream.write(f"\nTop {top} Processes across {len(hosts) - len(failures)} of {len(hosts)} host(s) "
+                         f"(ordered by {order_by}):\n")
+        RecordWriter(stream, output_format, ('host',) + PROCESS_FIELDS, significant_digits,
+                     lambda proc: f"Host: {proc['host']}, " + format_process_line(proc, significant_digits)
+                     ).write_all(processes)
+    finish_output(output_file, "Process information", prompt)
+
+# Watchdog: sample every interval and report --alert rules as they fire and clear.
+# Alerts go to the output stream, to an --on-alert command and, with --alert-exit, into the error path.
+def alert_processes(rules, interval=2.0, on_alert=None, alert_exit=False, output_file='-', output_format='text'):
+    from processAlerts import ALERT_FIELDS, AlertError, AlertMonitor
+    from processWatch import ProcessTracker
+
+    monitor = AlertMonitor(rules)
+    tracker = ProcessTracker()
+
+    def render(event):
+        stamp = datetime.datetime.fromtimestamp(event['timestamp']).strftime('%Y-%m-%d %H:%M:%S')
+        label = "ALERT" if event['state'] == 'fired' else "CLEARED"
+        return f"[{stamp}] {label} {event['rule']}: PID {event['pid']} ({event['name']}), value {event['value']:,.2f}"
+
+    with open_output(output_file, output_format) as stream:
+        writer = RecordWriter(stream, output_format, ALERT_FIELDS, render_text=render)
+        if output_format == 'text':
+            stream.write(f"Watching {len(monitor.rules)} rule(s) every {interval}s (Ctrl+C to stop)\n")
+        try:
+            while True:
+                rows = tracker.sample()
+                with tracing.phase('alerts.evaluate'):
+                    events = monitor.update(rows, time.monotonic())
+                now = time.time()
+                for event in events:
+                    event['timestamp'] = now
+                    writer.write(event)
+                    if on_alert and event['state'] == 'fired':
+                        run_alert_hook(on_alert, event)
+                stream.flush()
+                fired = [event for event in events if event['state'] == 'fired']
+                if alert_exit and fired:
+                    raise AlertError("; ".join(f"{event['rule']} for PID {event['pid']} ({event['name']})"
+                                               for event in fired))
+                time.sleep(interval)
+        except KeyboardInterrupt:
+            print()
+
+# Function to start an --on-alert command without waiting for it; the alert is passed in RT_ALERT_* variables
+def run_alert_hook(command, event):
+    env = dict(os.environ, RT_ALERT_RULE=event['rule'], RT_ALERT_PID=str(event['pid']),
+               RT_ALERT_NAME=str(event['name']), RT_ALERT_VALUE=str(event['value']))
+    try:
+        subprocess.Popen(command, shell=True, env=env)
+        tracing.count('alerts.hooks')
+    except OSError as e:
+        print(f"Warning: alert hook failed: {e}", file=sys.stderr)
+
+# Sample every process each interval and append it to a ring-buffer recording
+def record_processes(path, interval=1.0, capacity=1_000_000):
+    from processRecorder import RingRecorder
+    from processWatch import ProcessTracker
+
+    recorder = RingRecorder(path, capacity)
+    tracker = ProcessTracker()
+    tracker.sample()  # baseline tick so the first recorded CPU% is real
+    print(f"Recording processes to {path} every {interval}s (Ctrl+C to stop)")
+    try:
+        while True:
+            time.sleep(interval)
+            recorder.append(time.time(), tracker.sample())
+    except KeyboardInterrupt:
+        print(f"\nRecorded {recorder.count} samples.")
+    finally:
+        recorder.close()
+
+# Function to turn an epoch or ISO-8601 time argument into epoch seconds
+def parse_time(value):
+    if value is None:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        return datetime.datetime.fromisoformat(value).timestamp()
+
+# Answer "top N between T1 and T2" from a recording
+def replay_processes(path, order_by=None, top=10, since=None, until=None, significant_digits=None,
+                     output_file='-', output_format='text'):
+    from processRecorder import RingReader
+
+    reader = RingReader(path)
+    try:
+        processes = reader.top(order_by, top, parse_time(since), parse_time(until))
+    finally:
+        reader.close()
+
+    digits = significant_digits if significant_digits is not None else 2
+    def render(proc):
+        first = datetime.datetime.fromtimestamp(proc['first_seen']).strftime('%Y-%m-%d %H:%M:%S')
+        last = datetime.datetime.fromtimestamp(proc['last_seen']).strftime('%Y-%m-%d %H:%M:%S')
+        return (f"PID: {proc['pid']}, Samples: {proc['samples']}, Avg CPU: {proc['cpu_percent']:.{digits}f}%, "
+                f"Peak RSS: {proc['peak_rss']:,} bytes, Avg Disk: {proc['disk_usage']:.{digits}f} bytes/s, "
+                f"Seen: {first} - {last}")
+
+    with open_output(output_file, output_format) as stream:
+        if output_format == 'text':
+            stream.write(f"\nTop {top} Processes in {path} (ordered by {order_by if order_by else 'cpu'}):\n")
+        RecordWriter(stream, output_format, REPLAY_FIELDS, significant_digits, render).write_all(processes)
+    finish_output(output_file, "Replay results", prompt=False)
 
 # Function to prompt user and open the file if requested
 def prompt_open_file(file_path):
+    if sys.stdin is None or not sys.stdin.isatty():
+        return  # no terminal to answer (cron, pipes): same as "no", like help's prompt
     open_file = input("Would you like to open the output file? [y/n]: ").strip().lower()
     if open_file == 'y':
         try:
@@ -109,16 +678,53 @@ def prompt_open_file(file_path):
     else:
         print("File not opened.")
 
-if __name__ == "__main__":
+def main(argv=None):
     parser = argparse.ArgumentParser(description="List open windows and top processes.")
-    parser.add_argument('-p', '--processes', action='store_true', help="List the top 10 processes.")
+    parser.add_argument('-p', '--processes', action='store_true', help="List the top processes.")
     parser.add_argument('-c', '--cpu', action='store_true', help="Order processes by CPU usage.")
     parser.add_argument('-m', '--memory', action='store_true', help="Order processes by Memory usage.")
     parser.add_argument('-d', '--disk', action='store_true', help="Order processes by Disk usage.")
     parser.add_argument('-n', '--network', action='store_true', help="Order processes by Network usage.")
     parser.add_argument('-sd', '--significant_digits', type=int, help="Number of significant digits for numerical output.")
+    parser.add_argument('-k', '--top', type=int, default=10, help="Number of processes to list (default is 10).")
+    parser.add_argument('--accurate', action='store_true', help="With -m, rank by PSS (shared memory split between its users) instead of RSS; only the RSS leaders are measured.")
+    parser.add_argument('--backend', choices=['psutil', 'proc'], default='psutil', help="Process snapshot source; 'proc' reads /proc directly on Linux (default is psutil).")
+    parser.add_argument('-w', '--watch', action='store_true', help="Keep refreshing the process list in place (orders by CPU by default).")
+    parser.add_argument('-i', '--interval', type=float, default=2.0, help="Seconds between refreshes in watch, record, --pid and --leaks mode (default is 2).")
+
+    parser.add_argument('--record', metavar='FILE', help="Append samples of every process to a ring-buffer recording every -i seconds.")
+    parser.add_argument('--capacity', type=int, default=1_000_000, help="Records kept in a new recording before the oldest are overwritten (default is 1000000).")
+    parser.add_argument('--replay', metavar='FILE', help="Show the top processes from a recording.")
+    parser.add_argument('--since', help="Replay start time (epoch seconds or ISO-8601).")
+    parser.add_argument('--until', help="Replay end time (epoch seconds or ISO-8601).")
+    parser.add_argument('-g', '--group-by', choices=['name', 'parent', 'user'], help="Aggregate processes per name, parent or user and rank the groups.")
+    parser.add_argument('--tree', action='store_true', help="With --group-by, show each top group's biggest processes and their children.")
+    parser.add_argument('--where', action='append', metavar='EXPR', help="Only include processes matching EXPR, e.g. name~gunicorn, user=svc, rss>500MB (repeat to combine).")
+    parser.add_argument('--cgroups', action='store_true', help="Rank cgroups (containers, systemd slices) by their kernel totals, ordered by -c, -m or -d (cgroup v2).")
+    parser.add_argument('--with-windows', action='store_true', help="List the windows each top process owns.")
+    parser.add_argument('--with-processes', action='store_true', help="Show the owning process, CPU and memory for each open window.")
+    parser.add_argument('--width', type=int, help="Line width of the window matrix; longer titles are cut (default is the terminal width, 0 for no limit).")
+    parser.add_argument('--title', metavar='REGEX', help="Only list windows whose title matches REGEX (case-insensitive).")
+    parser.add_argument('--sort-title', action='store_true', help="Sort the window list by title.")
+    parser.add_argument('--page', type=int, default=1, help="Page of the window list to show with --page-size (default is 1).")
+    parser.add_argument('--page-size', type=int, default=0, help="Windows per page (default is 0, all on one page).")
+    parser.add_argument('--pid', type=int, help="Drill into one process every -i seconds: CPU, fds, connections, context switches, IO rate and its -k busiest threads.")
+    parser.add_argument('--leaks', action='store_true', help="Sample memory every -i seconds for --duration and rank processes by sustained growth (USS with --accurate).")
+    parser.add_argument('--duration', default='1h', help="How long --leaks samples, e.g. 30m or 1h (default is 1h).")
+    parser.add_argument('--alert', action='append', metavar='RULE', help="Keep sampling and report when RULE holds, e.g. \"cpu>90 for 30s\" or \"rss>2GB\" (repeatable).")
+    parser.add_argument('--on-alert', metavar='COMMAND', help="Shell command run for each alert, with RT_ALERT_RULE, RT_ALERT_PID, RT_ALERT_NAME and RT_ALERT_VALUE set.")
+    parser.add_argument('--alert-exit', action='store_true', help="Stop at the first alert and report it as an error (exit code 1).")
+    parser.add_argument('--serve', action='store_true', help="Serve the process snapshot over HTTP for --hosts, refreshed every -i seconds.")
+    parser.add_argument('--bind', default='127.0.0.1', help="Address --serve listens on (default is 127.0.0.1; use 0.0.0.0 for other machines).")
+    parser.add_argument('--port', type=int, help="Port --serve listens on (default is 8765).")
+    parser.add_argument('--hosts', metavar='HOST[:PORT],...', help="Merge the top processes of several --serve agents into one global list.")
+    parser.add_argument('--timeout', type=float, default=2.0, help="Seconds to wait for each --hosts agent (default is 2).")
+    parser.add_argument('-f', '--format', choices=FORMATS, default='text', help="Output format (default is text).")
+    parser.add_argument('-o', '--output', help="Output file, or '-' for stdout (default is output.txt; stdout for watch and replay).")
+    parser.add_argument('--no-prompt', action='store_true', help="Don't ask to open the output file afterwards.")
+    parser.add_argument('--profile', nargs='?', const='-', metavar='FILE', help="Time each phase and count skipped processes: a JSON summary on stderr, or written to FILE (a .prof FILE gets a cProfile dump).")
 
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
 
     # Determine sorting based on arguments
     order_by = None
@@ -131,10 +737,107 @@ if __name__ == "__main__":
     elif args.network:
         order_by = 'network'
 
-    # If any process-related option is specified, show sorted processes
-    if args.processes or order_by:
-        display_top_processes(order_by, args.significant_digits, "output.txt")
-    else:
-        # Otherwise, list open windows and print matrix to output.txt
-        open_windows = count_open_windows()
-        print_matrix_windows(open_windows, "output.txt")
+    prompt = not args.no_prompt
+    if args.accurate:
+        if order_by not in (None, 'memory'):
+            parser.error("--accurate ranks by memory; it can't be combined with -c, -d or -n")
+        order_by = 'memory'
+    if args.title:
+        try:
+            re.compile(args.title)
+        except re.error as e:
+            parser.error(f"invalid --title pattern: {e}")
+    if args.page < 1 or args.page_size < 0:
+        parser.error("--page must be 1 or more and --page-size 0 or more")
+    where = None
+    if args.where:
+        from processFilter import ProcessFilter
+        try:
+            where = ProcessFilter(args.where)
+        except (ValueError, re.error) as e:
+            parser.error(str(e))
+
+    alerts = None
+    if args.alert:
+        from processAlerts import AlertMonitor
+        try:
+            alerts = AlertMonitor(args.alert).rules  # compiled once, before the first tick
+        except ValueError as e:
+            parser.error(str(e))
+
+    if args.pid is not None and not psutil.pid_exists(args.pid):
+        parser.error(f"no process with PID {args.pid}")
+
+    if args.replay and order_by == 'network':
+        parser.error("--replay can be ordered by -c, -m or -d; recordings keep no network data")
+    since = until = None
+    try:
+        since, until = parse_time(args.since), parse_time(args.until)
+    except ValueError:
+        parser.error("--since and --until take epoch seconds or an ISO-8601 time (e.g. 2024-05-01T14:00)")
+
+    cgroup_root = None
+    if args.cgroups:
+        from processCgroups import find_cgroup_root
+        if order_by == 'network':
+            parser.error("--cgroups can be ordered by -c, -m or -d; cgroups keep no network totals")
+        cgroup_root = find_cgroup_root()
+        if cgroup_root is None:
+            parser.error("--cgroups needs cgroup v2 (the unified hierarchy under /sys/fs/cgroup)")
+
+    duration = None
+    if args.leaks:
+        from processFilter import parse_duration
+        try:
+            duration = parse_duration(args.duration)
+        except ValueError as e:
+            parser.error(str(e))
+
+    hosts = None
+    if args.hosts:
+        from processAgent import parse_hosts
+        try:
+            hosts = parse_hosts(args.hosts)
+        except ValueError:
+            parser.error(f"invalid --hosts list '{args.hosts}' (expected host[:port],...)")
+
+    with tracing.session(args.profile):
+        if alerts:
+            alert_processes(alerts, args.interval, args.on_alert, args.alert_exit, args.output or '-', args.format)
+        elif args.pid is not None:
+            drill_process(args.pid, args.interval, args.top, args.significant_digits, args.output or '-', args.format)
+        elif args.leaks:
+            find_leaks(duration, args.interval, args.top, where, args.accurate, args.significant_digits,
+                       args.output or '-', args.format)
+        elif args.serve:
+            serve_processes(args.bind, args.port, args.interval, where)
+        elif hosts:
+            display_host_processes(hosts, order_by, args.significant_digits, args.output or "output.txt", args.top,
+                                   args.timeout, args.format, prompt)
+        elif args.record:
+            record_processes(args.record, args.interval, args.capacity)
+        elif args.replay:
+            replay_processes(args.replay, order_by, args.top, since, until, args.significant_digits,
+                             args.output or '-', args.format)
+        elif args.watch:
+            watch_processes(order_by, args.significant_digits, args.top, args.interval, args.output or '-', args.format)
+        elif args.cgroups:
+            display_cgroups(order_by, args.significant_digits, args.output or "output.txt", args.top, args.format, prompt,
+                            cgroup_root)
+        elif args.group_by:
+            display_grouped_processes(args.group_by, order_by, args.significant_digits, args.output or "output.txt",
+                                      args.top, args.format, prompt, args.tree, where)
+        # If any process-related option is specified, show sorted processes
+        elif args.processes or order_by or where:
+            windows = build_window_index() if args.with_windows else None
+            display_top_processes(order_by, args.significant_digits, args.output or "output.txt", args.top, args.backend,
+                                  args.format, prompt, where, windows, args.accurate)
+        else:
+            # Otherwise, list open windows and print matrix to output.txt
+            windows = build_window_index()
+            open_windows = join_window_processes(windows) if args.with_processes else count_open_windows(windows)
+            open_windows = select_windows(open_windows, args.title, args.sort_title, args.page, args.page_size)
+            print_matrix_windows(open_windows, args.output or "output.txt", args.format, prompt, args.width)
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,91 @@
 import argparse
-import subprocess
+import importlib
+import json
 import os
+import runpy
+import sys
+import traceback
 
-def main():
+import tracing
+
+# Directory holding main.py, tools.json and the tool scripts
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+TOOLS_JSON_PATH = os.path.join(BASE_DIR, 'tools.json')
+
+# Parsed tools.json, keyed on the file's mtime so edits are picked up
+_registry_cache = {'mtime': None, 'tools': None}
+
+
+def load_registry(path=TOOLS_JSON_PATH):
+    """Return the parsed tools.json, re-reading it only when its mtime changes."""
+    mtime = os.path.getmtime(path)
+    if _registry_cache['tools'] is None or _registry_cache['mtime'] != mtime:
+        with open(path, 'r') as f:
+            _registry_cache['tools'] = json.load(f)
+        _registry_cache['mtime'] = mtime
+    return _registry_cache['tools']
+
+
+def load_tool_module(command):
+    """Import the module behind a command on first use (later calls hit sys.modules)."""
+    tool = load_registry()[command]
+    if BASE_DIR not in sys.path:
+        sys.path.insert(0, BASE_DIR)
+    return importlib.import_module(os.path.splitext(tool['filename'])[0])
+
+
+def load_tool(command):
+    """Return the entry function of a command's tool module."""
+    tool = load_registry()[command]
+    return getattr(load_tool_module(command), tool.get('entry', 'main'))
+
+
+def report_error(error, interactive):
+    """Print a tool's exception to stderr, then offer the help page if someone can answer."""
+    message = f"{type(error).__name__}: {error}"
+    if os.environ.get(tracing.ENV_VAR):
+        traceback.print_exception(type(error), error, error.__traceback__, file=sys.stderr)
+    else:
+        print(message, file=sys.stderr)
+    if interactive:
+        load_tool_module('help').handle_error(message)
+
+
+def dispatch(command, extra_args=None, interactive=None):
+    """Run a tool in this process and return its exit code.
+
+    A tool's exception is printed to stderr and gives exit code 1. The interactive
+    help prompt is only offered when `interactive` is true (by default, when stdin
+    is a terminal), so cron jobs and pipes never wait on input().
+    """
+    extra_args = list(extra_args or [])
+    if interactive is None:
+        interactive = sys.stdin is not None and sys.stdin.isatty()
+    tools = load_registry()
+
+    if command not in tools:
+        print(f"Error: Unknown command '{command}'")
+        command, extra_args = 'help', []
+
+    # RANDOMTOOLS_TRACE traces any tool, including the help shown for its errors
+    with tracing.session():
+        try:
+            with tracing.phase('dispatch.load'):
+                entry = load_tool(command)
+            result = entry(extra_args)
+        except SystemExit as e:
+            # Tools call exit() on bad input; don't let that take down the caller (e.g. the GUI)
+            return e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+        except Exception as e:
+            if command == 'help':
+                raise
+            tracing.count(f"dispatch.errors.{type(e).__name__}")
+            report_error(e, interactive)
+            return 1
+    return result if isinstance(result, int) else 0
+
+
+def main(argv=None):
     parser = argparse.ArgumentParser(description="Random Tools Manager")
     parser.add_argument(
         'command',
@@ -14,24 +97,16 @@ def main():
         nargs=argparse.REMAINDER,
         help="Additional arguments for the command."
     )
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
 
     # If no command is given, launch the GUI
     if not args.command:
         print("No command provided. Launching GUI...")
-        subprocess.run(["python", "gui.py"])
-        return
-
-    # Handle commands
-    if args.command == "lw":
-        subprocess.run(["python", "listWindows.py"] + args.extra_args)
-    elif args.command == "ow":
-        subprocess.run(["python", "openwindows.py"] + args.extra_args)
-    elif args.command == "help":
-        subprocess.run(["python", "help.py"])
-    else:
-        print(f"Error: Unknown command '{args.command}'")
-        subprocess.run(["python", "help.py"])
+        runpy.run_path(os.path.join(BASE_DIR, 'gui.py'), run_name='__main__')
+        return 0
+
+    return dispatch(args.command, args.extra_args)
+
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
@@ -2,8 +2,10 @@ import os
 import subprocess
 import time
 import argparse
-import pygetwindow as gw
-from ctypes import windll
+import json
+import psutil
+import tracing
+from windowBackends import get_window_backend
 
 # Mapping of file extensions to valid viewers
 EXTENSION_VIEWER_MAP = {
@@ -18,13 +20,6 @@ EXTENSION_VIEWER_MAP = {
     '.xlsx': ['Excel'],
 }
 
-def get_screen_size():
-    # Use ctypes to get the screen size on Windows
-    user32 = windll.user32
-    screen_width = user32.GetSystemMetrics(0)
-    screen_height = user32.GetSystemMetrics(1)
-    return screen_width, screen_height
-
 def validate_viewer(filename, viewer):
     """Validate if the viewer can open the file based on its extension."""
     file_ext = os.path.splitext(filename)[-1].lower()  # Get file extension
@@ -36,7 +31,8 @@ def validate_viewer(filename, viewer):
             print(f"  - {valid_viewer}")
         exit()
 
-def open_file(filename, num_windows=5, viewer='Notepad'):
+# Function to find the file in the current or parent directory, exiting if it is in neither
+def resolve_file(filename):
     current_dir = os.getcwd()  # Get current directory
     test = os.path.join(current_dir, filename)  # Create full path
 
@@ -54,42 +50,121 @@ def open_file(filename, num_windows=5, viewer='Notepad'):
         else:
             print(f"The file '{filename}' does not exist in the current or parent directory.")
             exit()
+    return test
 
-    # Validate viewer before proceeding
-    validate_viewer(filename, viewer)
-
-    # Open the file in multiple windows with the specified viewer
-    for _ in range(num_windows):
-        subprocess.Popen([viewer, test], shell=True)
-        print("Window Opened")
-        time.sleep(0.5)  # Delay to ensure each window opens and registers on the taskbar
-
-    # Get screen size
-    screen_width, screen_height = get_screen_size()
-    cols = int(num_windows ** 0.5)
-    rows = (num_windows // cols) + (num_windows % cols > 0)
+# Function to collect the launched pids plus everything they spawned (shell=True starts viewers via cmd)
+def launched_pids(launched):
+    pids = set()
+    for popen in launched:
+        pids.add(popen.pid)
+        try:
+            pids.update(child.pid for child in psutil.Process(popen.pid).children(recursive=True))
+        except psutil.Error as e:
+            tracing.skipped('launched', e)
+    return pids
 
+# Function to wait for new windows and place each batch in the grid as soon as it appears
+def arrange_windows(backend, launched, expected, titles, known_handles, timeout=10.0, initial_delay=0.05, max_delay=1.0):
+    screen_width, screen_height = backend.screen_size()
+    cols = int(expected ** 0.5)
+    rows = (expected // cols) + (expected % cols > 0)
     win_width = screen_width // cols
     win_height = screen_height // rows
 
-    # Position each window in a grid layout
-    open_windows = gw.getWindowsWithTitle(os.path.basename(filename))
-    for index, window in enumerate(open_windows[:num_windows]):
-        row, col = divmod(index, cols)
-        x = col * win_width
-        y = row * win_height
-        window.moveTo(x, y)
-        window.resizeTo(win_width, win_height)
+    seen = set(known_handles)
+    slot = 0
+    delay = initial_delay
+    deadline = time.monotonic() + timeout
+    while slot < expected:
+        # One list, one batched pid lookup and one batched move per poll, however many windows there are
+        tracing.count('arrange.polls')
+        with tracing.phase('arrange.list'):
+            new_windows = [(handle, title) for handle, title in backend.list_windows() if handle not in seen]
+            owners = backend.window_pids([handle for handle, _ in new_windows]) if new_windows else {}
+            pids = launched_pids(launched) if new_windows else set()
+
+        placements = []
+        for handle, title in new_windows:
+            # Prefer pid ownership; single-instance viewers open windows in an older process, so fall back to the title
+            if owners.get(handle) in pids or any(name in title for name in titles):
+                seen.add(handle)
+                row, col = divmod(slot, cols)
+                placements.append((handle, col * win_width, row * win_height, win_width, win_height))
+                slot += 1
+                if slot == expected:
+                    break
+        if placements:
+            with tracing.phase('arrange.move'):
+                backend.move_resize(placements)
+            tracing.count('arrange.placed', len(placements))
+
+        remaining = deadline - time.monotonic()
+        if slot == expected or remaining <= 0:
+            break
+        with tracing.phase('arrange.wait'):
+            time.sleep(min(delay, remaining))
+        delay = min(delay * 2, max_delay)  # exponential backoff between polls
+    return slot
+
+# Function to open every (filename, num_windows, viewer) entry at once and lay out all their windows
+def open_files(entries, timeout=10.0, backend=None):
+    backend = backend if backend is not None else get_window_backend()
+    jobs = []
+    with tracing.phase('resolve'):
+        for filename, num_windows, viewer in entries:
+            path = resolve_file(filename)
+            validate_viewer(filename, viewer)  # Validate viewer before proceeding
+            jobs.append((filename, path, num_windows, viewer))
+
+    with tracing.phase('windows.list'):
+        known_handles = {handle for handle, _ in backend.list_windows()}
 
+    # Launch every viewer without waiting between them
+    launched = []
+    with tracing.phase('launch'):
+        for filename, path, num_windows, viewer in jobs:
+            for _ in range(num_windows):
+                launched.append(subprocess.Popen([viewer, path], shell=(os.name == 'nt')))  # cmd resolves viewer names like Notepad
+            print(f"Launched {num_windows} window(s) of '{filename}' with {viewer}")
+
+    expected = sum(num_windows for _, _, num_windows, _ in jobs)
+    titles = [os.path.basename(filename) for filename, *_ in jobs]
+    arranged = arrange_windows(backend, launched, expected, titles, known_handles, timeout)
+    if arranged < expected:
+        print(f"Only {arranged} of {expected} windows appeared within {timeout}s; the rest were left where they opened.")
+    return arranged
+
+def open_file(filename, num_windows=5, viewer='Notepad', timeout=10.0, backend=None):
+    open_files([(filename, num_windows, viewer)], timeout, backend)
     print(f"Opened {num_windows} instances of '{filename}' with {viewer}.")
 
-if __name__ == "__main__":
+# Function to read a JSON manifest: a list of {"filename", "num_windows", "viewer"} objects
+def load_manifest(path):
+    with open(path, 'r') as f:
+        manifest = json.load(f)
+    return [(entry['filename'], int(entry.get('num_windows', 1)), entry.get('viewer', 'Notepad')) for entry in manifest]
+
+def main(argv=None):
     parser = argparse.ArgumentParser(
         description="Open a file in multiple windows with specified viewer."
     )
-    parser.add_argument('filename', help="The name of the file to open.")
+    parser.add_argument('filename', nargs='?', help="The name of the file to open.")
     parser.add_argument('num_windows', nargs='?', type=int, default=5, help="Number of windows to open (default is 5).")
     parser.add_argument('viewer', nargs='?', default='Notepad', help="Application to use for opening the file (default is Notepad).")
-    args = parser.parse_args()
+    parser.add_argument('--manifest', help="JSON file listing several files to open: [{\"filename\", \"num_windows\", \"viewer\"}, ...].")
+    parser.add_argument('--timeout', type=float, default=10.0, help="Seconds to wait for all windows to appear (default is 10).")
+    parser.add_argument('--profile', nargs='?', const='-', metavar='FILE', help="Time each phase: a JSON summary on stderr, or written to FILE (a .prof FILE gets a cProfile dump).")
+    args = parser.parse_args(argv)
 
-    open_file(args.filename, args.num_windows, args.viewer)
+    if not (args.manifest or args.filename):
+        parser.error("a filename or --manifest is required")
+    with tracing.session(args.profile):
+        if args.manifest:
+            entries = load_manifest(args.manifest)
+            arranged = open_files(entries, args.timeout)
+            print(f"Opened {len(entries)} file(s), arranged {arranged} window(s).")
+        else:
+            open_file(args.filename, args.num_windows, args.viewer, args.timeout)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+import contextlib
+import csv
+import json
+import sys
+
+FORMATS = ('text', 'jsonl', 'csv')
+
+# Columns of a process record, in output order
+PROCESS_FIELDS = ('pid', 'name', 'cpu_percent', 'memory_percent', 'disk_usage', 'net_usage')
+WINDOW_FIELDS = ('title',)
+WINDOW_PROCESS_FIELDS = ('title', 'pid', 'name', 'cpu_percent', 'memory_percent')
+
+
+# Function to open an output target; '-' means stdout, which is left open afterwards
+@contextlib.contextmanager
+def open_output(output_file, output_format='text'):
+    if output_file == '-':
+        yield sys.stdout
+        sys.stdout.flush()
+    else:
+        # The csv module does its own line endings
+        with open(output_file, 'w', newline='' if output_format == 'csv' else None) as f:
+            yield f
+
+
+# Function to flatten a list of strings (window titles, log samples) into one CSV cell
+def joined(value):
+    if isinstance(value, list) and all(isinstance(item, str) for item in value):
+        return "; ".join(value)
+    return value
+
+
+class RecordWriter:
+    """Writes records to a stream one at a time as text, JSON Lines or CSV.
+
+    Numbers are kept raw until here; significant digits are applied only when a
+    record is rendered, so nothing upstream has to format strings.
+    """
+
+    def __init__(self, stream, output_format='text', fieldnames=PROCESS_FIELDS,
+                 significant_digits=None, render_text=str):
+        if output_format not in FORMATS:
+            raise ValueError(f"Unknown output format '{output_format}'")
+        self.stream = stream
+        self.output_format = output_format
+        self.fieldnames = fieldnames
+        self.significant_digits = significant_digits
+        self.render_text = render_text
+        self.count = 0
+        self.csv_writer = None
+        if output_format == 'csv':
+            self.csv_writer = csv.DictWriter(stream, fieldnames, extrasaction='ignore')
+            self.csv_writer.writeheader()
+
+    # Function to round float fields for the machine-readable formats
+    def rounded(self, record):
+        if self.significant_digits is None:
+            return record
+        return {key: round(value, self.significant_digits) if isinstance(value, float) else value
+                for key, value in record.items()}
+
+    def write(self, record):
+        if self.output_format == 'text':
+            self.stream.write(self.render_text(record) + "\n")
+        elif self.output_format == 'jsonl':
+            record = self.rounded(record)
+            self.stream.write(json.dumps({key: record.get(key) for key in self.fieldnames}) + "\n")
+        else:
+            record = self.rounded(record)
+            self.csv_writer.writerow({key: joined(record.get(key)) for key in self.fieldnames})
+        self.count += 1
+
+    def write_all(self, records):
+        for record in records:
+            self.write(record)
+        return self.count
@@ -0,0 +1,153 @@
+import heapq
+import os
+import sys
+from array import array
+
+# Files under /proc/<pid> each metric is read from
+FIELD_SOURCES = {
+    'cpu_percent': ('stat',),
+    'memory_percent': ('statm',),
+    'disk_usage': ('io',),
+    'net_usage': ('io',),
+}
+ALL_SOURCES = ('stat', 'statm', 'io')
+
+PAGE_SIZE = os.sysconf('SC_PAGE_SIZE') if hasattr(os, 'sysconf') else 4096
+CLOCK_TICKS = os.sysconf('SC_CLK_TCK') if hasattr(os, 'sysconf') else 100
+
+
+def available(proc_root='/proc'):
+    """Return True when the /proc backend can be used on this machine."""
+    return sys.platform.startswith('linux') and os.access(os.path.join(proc_root, 'self', 'stat'), os.R_OK)
+
+
+class ProcessColumns:
+    """Array-backed process snapshot: one compact column per metric, one index per process."""
+
+    def __init__(self):
+        self.pid = array('q')
+        self.name = []
+        self.cpu_ticks = array('Q')    # utime + stime
+        self.start_ticks = array('Q')  # start time in clock ticks since boot
+        self.rss = array('Q')          # bytes
+        self.read_bytes = array('Q')
+        self.write_bytes = array('Q')
+        self.io_count = array('Q')     # syscr + syscw
+
+    def __len__(self):
+        return len(self.pid)
+
+
+class ProcBackend:
+    """Reads process metrics straight from /proc into ProcessColumns.
+
+    Every file is read with a single os.readv() into one reused buffer, and only
+    the files needed for the requested metrics are opened.
+    """
+
+    def __init__(self, proc_root='/proc', buffer_size=4096):
+        self.proc_root = proc_root
+        self.buffer = bytearray(buffer_size)
+        self.view = memoryview(self.buffer)
+
+    # Function to read a whole (small) file into the shared buffer
+    def read_file(self, path):
+        fd = os.open(path, os.O_RDONLY)
+        try:
+            size = os.readv(fd, [self.buffer])
+        finally:
+            os.close(fd)
+        return self.view[:size].tobytes()
+
+    # Function to list the numeric entries of /proc; PermissionError means the caller should fall back
+    def list_pids(self):
+        with os.scandir(self.proc_root) as entries:
+            return [int(entry.name) for entry in entries if entry.name.isdigit()]
+
+    # Function to read system-wide totals needed to turn columns into percentages
+    def system_totals(self):
+        meminfo = self.read_file(os.path.join(self.proc_root, 'meminfo'))
+        mem_total = int(meminfo.split(None, 2)[1]) * 1024  # "MemTotal: N kB" is always first
+        uptime = float(self.read_file(os.path.join(self.proc_root, 'uptime')).split()[0])
+        return mem_total, uptime
+
+    # Function to fill columns for the given pids (all of /proc by default) from the given files
+    def snapshot(self, sources=ALL_SOURCES, pids=None):
+        if pids is None:
+            pids = self.list_pids()
+        columns = ProcessColumns()
+        read_stat = 'stat' in sources
+        read_statm = 'statm' in sources
+        read_io = 'io' in sources
+
+        for pid in pids:
+            base = f"{self.proc_root}/{pid}/"
+            try:
+                if read_stat:
+                    stat = self.read_file(base + 'stat')
+                    name_end = stat.rfind(b')')
+                    name = stat[stat.find(b'(') + 1:name_end].decode(errors='replace')
+                    fields = stat[name_end + 2:].split()
+                    cpu_ticks = int(fields[11]) + int(fields[12])
+                    start_ticks = int(fields[19])
+                else:
+                    name, cpu_ticks, start_ticks = None, 0, 0
+                rss = int(self.read_file(base + 'statm').split()[1]) * PAGE_SIZE if read_statm else 0
+            except (FileNotFoundError, ProcessLookupError, PermissionError):
+                continue  # exited or hidden since listing
+
+            read_bytes = write_bytes = io_count = 0
+            if read_io:
+                try:
+                    io = self.read_file(base + 'io').split()
+                    io_count = int(io[5]) + int(io[7])
+                    read_bytes = int(io[9])
+                    write_bytes = int(io[11])
+                except (FileNotFoundError, ProcessLookupError, PermissionError):
+                    pass  # other users' io is root-only; keep the process with zero IO
+
+            columns.pid.append(pid)
+            columns.name.append(name)
+            columns.cpu_ticks.append(cpu_ticks)
+            columns.start_ticks.append(start_ticks)
+            columns.rss.append(rss)
+            columns.read_bytes.append(read_bytes)
+            columns.write_bytes.append(write_bytes)
+            columns.io_count.append(io_count)
+        return columns
+
+    # Function to compute one metric for every row of a snapshot
+    def metric_values(self, columns, field, mem_total, uptime):
+        if field == 'cpu_percent':
+            # Average over the process lifetime, the way ps reports %CPU
+            now_ticks = uptime * CLOCK_TICKS
+            return [cpu * 100 / (now_ticks - start) if now_ticks > start else 0.0
+                    for cpu, start in zip(columns.cpu_ticks, columns.start_ticks)]
+        if field == 'memory_percent':
+            return [rss * 100 / mem_total for rss in columns.rss]
+        if field == 'disk_usage':
+            return [r + w for r, w in zip(columns.read_bytes, columns.write_bytes)]
+        return list(columns.io_count)
+
+    # Function to return the top N rows shaped like listWindows.get_top_processes
+    def top_processes(self, sort_field=None, top=10):
+        mem_total, uptime = self.system_totals()
+        if sort_field is None:
+            pids = heapq.nsmallest(top, self.list_pids())
+        else:
+            ranked = self.snapshot(FIELD_SOURCES[sort_field])
+            values = self.metric_values(ranked, sort_field, mem_total, uptime)
+            winners = heapq.nlargest(top, range(len(ranked)), key=values.__getitem__)
+            pids = [ranked.pid[i] for i in winners]
+
+        # Second, tiny pass: every column for the winners only
+        columns = self.snapshot(ALL_SOURCES, pids)
+        metrics = {field: self.metric_values(columns, field, mem_total, uptime) for field in FIELD_SOURCES}
+        return [{
+            'pid': columns.pid[i],
+            'name': columns.name[i],
+            'cpu_percent': round(metrics['cpu_percent'][i], 1),
+            'memory_percent': metrics['memory_percent'][i],
+            'disk_usage': metrics['disk_usage'][i],
+            'net_usage': metrics['net_usage'][i],
+        } for i in range(len(columns))]
@@ -0,0 +1,185 @@
+import asyncio
+import heapq
+import itertools
+import json
+import socket
+import time
+from urllib.parse import parse_qs, urlsplit
+
+import tracing
+
+DEFAULT_PORT = 8765
+SORT_FIELDS = ('cpu_percent', 'memory_percent', 'disk_usage', 'net_usage')
+MAX_TOP = 1000
+
+
+class SnapshotCache:
+    """The latest process snapshot, pre-sorted by every metric so a request is a slice.
+
+    collect() runs in a worker thread (psutil calls block) every `interval` seconds;
+    requests in between are answered from memory and never touch the process table.
+    """
+
+    def __init__(self, collect, interval=2.0):
+        self.collect = collect
+        self.interval = interval
+        self.by_field = {field: [] for field in SORT_FIELDS}
+        self.timestamp = None
+        self.count = 0
+
+    def update(self, rows):
+        for field in SORT_FIELDS:
+            self.by_field[field] = sorted(rows, key=lambda row: row[field], reverse=True)
+        self.timestamp = time.time()
+        self.count = len(rows)
+
+    async def refresh_forever(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            with tracing.phase('agent.refresh'):
+                self.update(await loop.run_in_executor(None, self.collect))
+            await asyncio.sleep(self.interval)
+
+    def payload(self, sort_field, top):
+        return {
+            'host': socket.gethostname(),
+            'timestamp': self.timestamp,
+            'order_by': sort_field,
+            'processes': self.by_field[sort_field][:top],
+            'total': self.count,
+        }
+
+
+# Function to write one HTTP/1.0-style response and close the connection
+async def send_response(writer, status, body):
+    data = json.dumps(body).encode()
+    writer.write(f"HTTP/1.1 {status}\r\nContent-Type: application/json\r\nContent-Length: {len(data)}\r\n"
+                 "Connection: close\r\n\r\n".encode() + data)
+    await writer.drain()
+    writer.close()
+
+
+# Function to answer GET /processes?order=cpu_percent&top=10 (and GET /health) from the cache
+async def handle_request(cache, reader, writer):
+    try:
+        request_line = await asyncio.wait_for(reader.readline(), 5.0)
+        while (await asyncio.wait_for(reader.readline(), 5.0)) not in (b"\r\n", b"\n", b""):
+            pass  # headers are not needed
+        method, target, _ = request_line.decode('latin-1').split(' ', 2)
+    except (asyncio.TimeoutError, ValueError, ConnectionError):
+        writer.close()
+        return
+
+    url = urlsplit(target)
+    query = parse_qs(url.query)
+    if method != 'GET':
+        await send_response(writer, "405 Method Not Allowed", {'error': "only GET is supported"})
+    elif url.path == '/health':
+        await send_response(writer, "200 OK", {'ok': cache.timestamp is not None, 'timestamp': cache.timestamp})
+    elif url.path != '/processes':
+        await send_response(writer, "404 Not Found", {'error': f"unknown path {url.path}"})
+    else:
+        sort_field = query.get('order', ['cpu_percent'])[0]
+        try:
+            top = min(int(query.get('top', ['10'])[0]), MAX_TOP)
+        except ValueError:
+            top = -1
+        if sort_field not in SORT_FIELDS or top < 0:
+            await send_response(writer, "400 Bad Request", {'error': "order must be a metric field and top a count"})
+        else:
+            tracing.count('agent.requests')
+            await send_response(writer, "200 OK", cache.payload(sort_field, top))
+
+
+async def serve_async(collect, bind='127.0.0.1', port=DEFAULT_PORT, interval=2.0):
+    cache = SnapshotCache(collect, interval)
+    cache.update(await asyncio.get_running_loop().run_in_executor(None, collect))  # never serve an empty cache
+    server = await asyncio.start_server(lambda reader, writer: handle_request(cache, reader, writer), bind, port)
+    refresher = asyncio.ensure_future(cache.refresh_forever())
+    addresses = ", ".join(f"{sock.getsockname()[0]}:{sock.getsockname()[1]}" for sock in server.sockets)
+    print(f"Serving process snapshots on {addresses}, refreshed every {interval}s (Ctrl+C to stop)")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        refresher.cancel()
+
+
+def serve(collect, bind='127.0.0.1', port=DEFAULT_PORT, interval=2.0):
+    """Run the agent until interrupted; collect() returns the full list of process rows."""
+    try:
+        asyncio.run(serve_async(collect, bind, port, interval))
+    except KeyboardInterrupt:
+        print()
+
+
+# Function to split "a,b:9000,[::1]:8000,::1" into [(host, port), ...]; IPv6 addresses need
+# brackets to carry a port, and an unbracketed one is a bare host
+def parse_hosts(value):
+    hosts = []
+    for item in value.split(','):
+        item = item.strip()
+        if not item:
+            continue
+        if item.startswith('['):
+            host, bracket, rest = item[1:].partition(']')
+            if not bracket or not host or (rest and not rest.startswith(':')):
+                raise ValueError(f"invalid host '{item}'")
+            hosts.append((host, int(rest[1:]) if rest else DEFAULT_PORT))
+        elif item.count(':') == 1:
+            host, _, port = item.partition(':')
+            hosts.append((host, int(port)))
+        else:
+            hosts.append((item, DEFAULT_PORT))
+    return hosts
+
+
+# Function to write host[:port] with brackets around IPv6 addresses, so parse_hosts reads it back
+def host_label(host, port=None):
+    name = f"[{host}]" if ':' in host else host
+    return name if port is None else f"{name}:{port}"
+
+
+# Function to fetch one agent's top processes (already sorted by sort_field, largest first)
+async def fetch_host(host, port, sort_field, top, timeout):
+    async def request():
+        reader, writer = await asyncio.open_connection(host, port)
+        try:
+            writer.write(f"GET /processes?order={sort_field}&top={top} HTTP/1.1\r\nHost: {host_label(host)}\r\n"
+                         "Connection: close\r\n\r\n".encode())
+            await writer.drain()
+            response = await reader.read()
+        finally:
+            writer.close()
+        head, _, body = response.partition(b"\r\n\r\n")
+        status = head.split(b"\r\n", 1)[0].decode('latin-1')
+        if status.split(' ')[1:2] != ['200']:
+            raise ConnectionError(f"agent answered '{status}'")
+        return json.loads(body)
+
+    return await asyncio.wait_for(request(), timeout)
+
+
+async def query_hosts_async(hosts, sort_field, top, timeout):
+    results = await asyncio.gather(*(fetch_host(host, port, sort_field, top, timeout) for host, port in hosts),
+                                   return_exceptions=True)
+    streams, failures = [], []
+    for (host, port), result in zip(hosts, results):
+        if isinstance(result, BaseException):
+            tracing.count(f"hosts.failed.{type(result).__name__}")
+            failures.append((host_label(host, port), "timed out" if isinstance(result, asyncio.TimeoutError) else str(result)))
+            continue
+        streams.append([dict(row, host=host_label(host, None if port == DEFAULT_PORT else port)) for row in result['processes']])
+    return streams, failures
+
+
+def query_hosts(hosts, sort_field='cpu_percent', top=10, timeout=2.0):
+    """Ask every agent at once and merge their sorted lists into a global top N.
+
+    Returns (processes, [(host, reason), ...] for agents that failed or timed out).
+    """
+    with tracing.phase('hosts.fetch'):
+        streams, failures = asyncio.run(query_hosts_async(hosts, sort_field, top, timeout))
+    # Each agent's list is already sorted, so a k-way merge only looks at the heads
+    merged = heapq.merge(*streams, key=lambda row: row[sort_field], reverse=True)
+    return list(itertools.islice(merged, top)), failures
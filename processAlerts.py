@@ -0,0 +1,125 @@
+import re
+from collections import deque
+
+from processFilter import FILTER_FIELDS, OPERATORS, STRING_FIELDS, parse_duration, parse_number
+
+RULE = re.compile(r'^\s*(.+?)(?:\s+for\s+(\S+))?\s*$')
+CONDITION = re.compile(r'^\s*([A-Za-z_]+)\s*(>=|<=|>|<)\s*(.*?)\s*$')
+ALERT_FIELDS = ('timestamp', 'state', 'rule', 'pid', 'name', 'value')
+
+
+class AlertError(RuntimeError):
+    """Raised by `lw --alert ... --alert-exit`; the dispatcher prints it on stderr and exits with status 1."""
+
+
+class WindowExtreme:
+    """Minimum (or maximum) of the samples in a sliding time window.
+
+    The deque holds a monotonic run of (time, value) pairs: a new sample first evicts
+    every sample it beats from the back, and samples older than the window fall off
+    the front. Each sample is pushed and popped at most once, so an update is O(1)
+    amortized and the extreme is always the front.
+    """
+
+    __slots__ = ('samples', 'keep_min')
+
+    def __init__(self, keep_min):
+        self.samples = deque()
+        self.keep_min = keep_min
+
+    def push(self, timestamp, value, horizon):
+        samples = self.samples
+        if self.keep_min:
+            while samples and samples[-1][1] >= value:
+                samples.pop()
+        else:
+            while samples and samples[-1][1] <= value:
+                samples.pop()
+        samples.append((timestamp, value))
+        while samples[0][0] < horizon:
+            samples.popleft()
+        return samples[0][1]
+
+
+class AlertRule:
+    """One compiled `field op value [for duration]` rule, e.g. "cpu>90 for 30s" or "rss>2GB".
+
+    A rule with a duration holds when every sample in the last `duration` seconds
+    passed: for > and >= that is the window minimum passing, for < and <= the maximum.
+    """
+
+    def __init__(self, text):
+        self.text = text.strip()
+        rule = RULE.match(text)
+        match = rule and CONDITION.match(rule.group(1))
+        if not match:
+            raise ValueError(f"Invalid alert '{text}' (expected e.g. \"cpu>90 for 30s\" or \"rss>2GB\")")
+        field, op, value = match.groups()
+        if field.lower() not in FILTER_FIELDS or FILTER_FIELDS[field.lower()][0] in STRING_FIELDS | {'pid', 'ppid'}:
+            raise ValueError(f"Alerts work on cpu, mem, rss, disk and net, not '{field}'")
+        self.key = FILTER_FIELDS[field.lower()][0]
+        self.compare = OPERATORS[op]
+        self.threshold = parse_number(value)
+        self.duration = parse_duration(rule.group(2)) if rule.group(2) else 0.0
+        self.keep_min = op in ('>', '>=')
+
+    def holds(self, extreme):
+        return self.compare(extreme, self.threshold)
+
+
+class AlertMonitor:
+    """Evaluates every rule against each tick's process rows and reports state changes.
+
+    Per process it keeps one WindowExtreme per rule and the time it was first seen,
+    so a tick costs O(1) amortized per process and rule. An alert fires once when its
+    rule starts to hold and clears once when it stops. Processes that exit (or whose
+    pid is reused, which the tracker reports as a gap) lose their state.
+    """
+
+    def __init__(self, rules):
+        self.rules = [rule if isinstance(rule, AlertRule) else AlertRule(rule) for rule in rules]
+        self.windows = {}     # pid -> [WindowExtreme per rule]
+        self.first_seen = {}  # pid -> time of the first sample counted
+        self.names = {}
+        self.active = set()   # (pid, rule index) currently firing
+
+    def update(self, rows, now):
+        events = []
+        seen = set()
+        for row in rows:
+            pid = row['pid']
+            seen.add(pid)
+            windows = self.windows.get(pid)
+            if windows is None or self.names[pid] != row['name']:
+                # First sample of a process: its rates are not real yet, start counting from the next one
+                if windows is not None:
+                    self.active.difference_update((pid, index) for index in range(len(self.rules)))
+                self.windows[pid] = [WindowExtreme(rule.keep_min) for rule in self.rules]
+                self.first_seen[pid] = None
+                self.names[pid] = row['name']
+                continue
+            if self.first_seen[pid] is None:
+                self.first_seen[pid] = now
+            observed = now - self.first_seen[pid]
+
+            for index, rule in enumerate(self.rules):
+                extreme = windows[index].push(now, row[rule.key], now - rule.duration)
+                firing = observed >= rule.duration and rule.holds(extreme)
+                key = (pid, index)
+                if firing and key not in self.active:
+                    self.active.add(key)
+                    events.append(self.event('fired', rule, row, extreme))
+                elif not firing and key in self.active:
+                    self.active.discard(key)
+                    events.append(self.event('cleared', rule, row, row[rule.key]))
+
+        for pid in self.windows.keys() - seen:
+            del self.windows[pid]
+            del self.first_seen[pid]
+            del self.names[pid]
+        self.active = {key for key in self.active if key[0] in self.windows}
+        return events
+
+    @staticmethod
+    def event(state, rule, row, value):
+        return {'state': state, 'rule': rule.text, 'pid': row['pid'], 'name': row['name'], 'value': value}
@@ -0,0 +1,120 @@
+import heapq
+import os
+import time
+
+import tracing
+
+CGROUP_FIELDS = ('cgroup', 'processes', 'cpu_percent', 'memory', 'disk_usage')
+SORT_FIELDS = {'cpu': 'cpu_percent', 'memory': 'memory', 'disk': 'disk_usage'}
+SAMPLE_WINDOW = 0.5  # seconds between the two reads that CPU and disk rates are taken from
+
+# cgroup v2 is mounted here on unified hosts, and under unified/ on hybrid (v1 + v2) ones
+CGROUP_ROOTS = ('/sys/fs/cgroup', '/sys/fs/cgroup/unified')
+
+
+# Function to find the cgroup v2 mount, or None when the host only has v1
+def find_cgroup_root(candidates=CGROUP_ROOTS):
+    for root in candidates:
+        if os.path.exists(os.path.join(root, 'cgroup.controllers')):
+            return root
+    return None
+
+
+# Function to read a cgroup file, or None when the group (or its controller) doesn't have it
+def read_text(path):
+    try:
+        with open(path) as f:
+            return f.read()
+    except OSError:
+        return None
+
+
+class CgroupReader:
+    """Per-cgroup totals read straight from the cgroup v2 stat files.
+
+    Processes are only used to find the groups: each pid's /proc/<pid>/cgroup
+    names its group, and then every group costs one read of cpu.stat, memory.current
+    and io.stat however many processes it holds. The kernel's totals include
+    threads and processes that already exited, which summing per-process values
+    would miss.
+    """
+
+    def __init__(self, cgroup_root, proc_root='/proc'):
+        self.cgroup_root = cgroup_root
+        self.proc_root = proc_root
+
+    # Function to map every pid to its cgroup v2 path and count the processes per group
+    def map_processes(self, pids=None):
+        if pids is None:
+            pids = [int(entry) for entry in os.listdir(self.proc_root) if entry.isdigit()]
+        groups = {}
+        for pid in pids:
+            text = read_text(os.path.join(self.proc_root, str(pid), 'cgroup'))
+            if text is None:
+                tracing.count('cgroups.pid_gone')
+                continue
+            for line in text.splitlines():
+                if line.startswith('0::'):  # the v2 entry; v1 lines name their controllers
+                    path = line[3:]
+                    groups[path] = groups.get(path, 0) + 1
+                    break
+        return groups
+
+    def group_dir(self, path):
+        return os.path.join(self.cgroup_root, path.lstrip('/'))
+
+    # Function to read the cumulative counters of one group: (CPU microseconds, memory bytes, IO bytes)
+    def read_group(self, path):
+        directory = self.group_dir(path)
+        cpu_usec = memory = io_bytes = None
+        text = read_text(os.path.join(directory, 'cpu.stat'))
+        if text is not None:
+            for line in text.splitlines():
+                key, _, value = line.partition(' ')
+                if key == 'usage_usec':
+                    cpu_usec = int(value)
+                    break
+        text = read_text(os.path.join(directory, 'memory.current'))
+        if text is not None:
+            memory = int(text)
+        text = read_text(os.path.join(directory, 'io.stat'))
+        if text is not None:
+            io_bytes = 0
+            for line in text.splitlines():  # "8:0 rbytes=1 wbytes=2 rios=3 wios=4 ..." per device
+                for item in line.split()[1:]:
+                    key, _, value = item.partition('=')
+                    if key in ('rbytes', 'wbytes'):
+                        io_bytes += int(value)
+        return cpu_usec, memory, io_bytes
+
+    def sample(self, groups):
+        with tracing.phase('cgroups.read'):
+            counters = {path: self.read_group(path) for path in groups}
+        tracing.count('cgroups.read', len(counters))
+        return time.monotonic(), counters
+
+    def top(self, sort_field=None, top=10, window=SAMPLE_WINDOW):
+        """Return the top cgroups by sort_field ('cpu_percent', 'memory', 'disk_usage', or process count)."""
+        with tracing.phase('cgroups.map'):
+            groups = self.map_processes()
+        start, before = self.sample(groups)
+        time.sleep(window)
+        end, after = self.sample(groups)
+        elapsed = end - start
+
+        rows = []
+        for path, processes in groups.items():
+            cpu_before, _, io_before = before[path]
+            cpu_after, memory, io_after = after[path]
+            rows.append({
+                'cgroup': path,
+                'processes': processes,
+                'cpu_percent': (cpu_after - cpu_before) / 1e6 / elapsed * 100
+                               if cpu_before is not None and cpu_after is not None else None,
+                'memory': memory,
+                'disk_usage': (io_after - io_before) / elapsed
+                              if io_before is not None and io_after is not None else None,
+            })
+        sort_field = sort_field or 'processes'
+        # Groups without the controller (the root, or no memory/io delegation) sort last
+        return heapq.nlargest(top, rows, key=lambda row: row[sort_field] if row[sort_field] is not None else -1)
@@ -0,0 +1,162 @@
+import heapq
+import os
+import time
+
+import psutil
+
+import tracing
+
+THREAD_FIELDS = ('timestamp', 'pid', 'tid', 'name', 'cpu_percent', 'cpu_time')
+
+
+class ThreadState:
+    """What the previous tick saw of one thread."""
+
+    __slots__ = ('tid', 'name', 'cpu_time', 'cpu_percent')
+
+    def __init__(self, tid, name, cpu_time):
+        self.tid = tid
+        self.name = name
+        self.cpu_time = cpu_time
+        self.cpu_percent = 0.0
+
+
+# Function to read a thread's name once, when it first shows up (Linux only)
+def thread_name(pid, tid):
+    try:
+        with open(f"/proc/{pid}/task/{tid}/comm") as f:
+            return f.read().strip()
+    except OSError:
+        return ""
+
+
+class ProcessSampler:
+    """Samples one process and its threads each tick, turning counters into per-second rates.
+
+    Thread state survives between ticks: a tick only creates entries for new
+    threads (reading their names once), updates the counters of the rest in place
+    and drops the ones that exited. It reports which threads changed so the
+    display can leave the others alone.
+    """
+
+    def __init__(self, pid):
+        self.proc = psutil.Process(pid)
+        self.pid = pid
+        self.name = self.proc.name()
+        self.threads = {}  # tid -> ThreadState
+        self.previous = None  # (time, cpu_time, context switches, io bytes)
+
+    # Function to count the process's sockets; this scans the system tables, so it is the priciest call
+    def count_connections(self):
+        connections = getattr(self.proc, 'net_connections', None) or self.proc.connections
+        try:
+            return len(connections(kind='inet'))
+        except psutil.AccessDenied:
+            return None
+
+    def sample(self):
+        """Return (summary, changed ThreadStates, exited tids); raises psutil.NoSuchProcess once it is gone."""
+        now = time.monotonic()
+        proc = self.proc
+        with tracing.phase('detail.sample'), proc.oneshot():
+            threads = proc.threads()
+            cpu_times = proc.cpu_times()
+            context = proc.num_ctx_switches()
+            rss = proc.memory_info().rss
+            try:
+                io_counters = proc.io_counters()
+            except (psutil.AccessDenied, AttributeError):
+                io_counters = None
+            try:
+                handles = proc.num_fds() if os.name == 'posix' else proc.num_handles()
+            except psutil.AccessDenied:
+                handles = None
+        with tracing.phase('detail.connections'):
+            connections = self.count_connections()
+
+        cpu_time = cpu_times.user + cpu_times.system
+        switches = context.voluntary + context.involuntary
+        io_bytes = io_counters.read_bytes + io_counters.write_bytes if io_counters else 0
+        elapsed = now - self.previous[0] if self.previous else 0
+
+        changed = []
+        seen = set()
+        known = self.threads
+        for thread in threads:
+            tid = thread.id
+            seen.add(tid)
+            total = thread.user_time + thread.system_time
+            state = known.get(tid)
+            if state is None:
+                state = known[tid] = ThreadState(tid, thread_name(self.pid, tid), total)
+                changed.append(state)
+                continue
+            percent = (total - state.cpu_time) / elapsed * 100 if elapsed > 0 else 0.0
+            if percent != state.cpu_percent:
+                state.cpu_percent = percent
+                changed.append(state)
+            state.cpu_time = total
+        exited = known.keys() - seen
+        for tid in exited:
+            del known[tid]
+        tracing.count('detail.threads.changed', len(changed))
+
+        summary = {
+            'pid': self.pid,
+            'name': self.name,
+            'threads': len(known),
+            'cpu_percent': 0.0,
+            'rss': rss,
+            'fds': handles,
+            'connections': connections,
+            'ctx_switches': 0.0,
+            'io_rate': 0.0,
+        }
+        if elapsed > 0:
+            summary['cpu_percent'] = (cpu_time - self.previous[1]) / elapsed * 100
+            summary['ctx_switches'] = (switches - self.previous[2]) / elapsed
+            summary['io_rate'] = (io_bytes - self.previous[3]) / elapsed
+        self.previous = (now, cpu_time, switches, io_bytes)
+        return summary, changed, exited
+
+    # Function to pick the busiest threads without sorting all of them
+    def top_threads(self, count):
+        return heapq.nlargest(count, self.threads.values(), key=lambda state: (state.cpu_percent, state.cpu_time))
+
+
+class ScreenDiff:
+    """Keeps a terminal screen in sync with a list of lines, rewriting only the lines that changed."""
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.shown = []
+
+    def update(self, lines):
+        write = self.stream.write
+        if not self.shown:
+            write("\033[H\033[2J")  # first frame: clear once
+        for row, line in enumerate(lines):
+            if row >= len(self.shown) or self.shown[row] != line:
+                write(f"\033[{row + 1};1H{line}\033[K")
+        for row in range(len(lines), len(self.shown)):
+            write(f"\033[{row + 1};1H\033[K")  # the list got shorter
+        write(f"\033[{len(lines) + 1};1H")
+        self.stream.flush()
+        self.shown = lines
+
+
+# Function to lay out one frame: the process summary, then the busiest threads
+def render_frame(summary, threads, interval):
+    def optional(value, fmt="{:,}"):
+        return "n/a" if value is None else fmt.format(value)
+
+    lines = [
+        f"PID {summary['pid']} ({summary['name']}) every {interval}s - Ctrl+C to stop",
+        f"CPU: {summary['cpu_percent']:.1f}%  RSS: {summary['rss']:,} bytes  Threads: {summary['threads']:,}  "
+        f"FDs: {optional(summary['fds'])}  Connections: {optional(summary['connections'])}",
+        f"Context switches: {summary['ctx_switches']:,.0f}/s  IO: {summary['io_rate']:,.0f} bytes/s",
+        "",
+        f"{'TID':>8}  {'CPU %':>7}  {'CPU time':>10}  Name",
+    ]
+    lines.extend(f"{state.tid:>8}  {state.cpu_percent:>7.1f}  {state.cpu_time:>10.2f}  {state.name}" for state in threads)
+    return lines
@@ -0,0 +1,105 @@
+import operator
+import re
+
+# Filter field -> (row key, cost). Cheap fields come with the process_iter prefetch, the
+# user needs one extra lookup, and expensive metrics are only fetched for processes that
+# passed everything cheaper.
+FILTER_FIELDS = {
+    'pid': ('pid', 'cheap'),
+    'ppid': ('ppid', 'cheap'),
+    'name': ('name', 'cheap'),
+    'user': ('username', 'lookup'),
+    'cpu': ('cpu_percent', 'expensive'),
+    'mem': ('memory_percent', 'expensive'),
+    'memory': ('memory_percent', 'expensive'),
+    'rss': ('rss', 'expensive'),
+    'disk': ('disk_usage', 'expensive'),
+    'net': ('net_usage', 'expensive'),
+}
+STRING_FIELDS = {'name', 'username'}
+
+OPERATORS = {
+    '=': operator.eq,
+    '!=': operator.ne,
+    '>': operator.gt,
+    '>=': operator.ge,
+    '<': operator.lt,
+    '<=': operator.le,
+}
+UNITS = {'': 1, 'b': 1, 'k': 1024, 'kb': 1024, 'm': 1024 ** 2, 'mb': 1024 ** 2,
+         'g': 1024 ** 3, 'gb': 1024 ** 3, 't': 1024 ** 4, 'tb': 1024 ** 4, '%': 1}
+
+EXPRESSION = re.compile(r'^\s*([A-Za-z_]+)\s*(!=|>=|<=|!~|=|~|>|<)\s*(.*?)\s*$')
+NUMBER = re.compile(r'^(-?\d+(?:\.\d+)?)\s*([A-Za-z%]*)$')
+
+
+# Function to turn "500MB", "1.5g", "90%" or "42" into a number
+def parse_number(text):
+    match = NUMBER.match(text)
+    if not match or match.group(2).lower() not in UNITS:
+        raise ValueError(f"Invalid number '{text}'")
+    return float(match.group(1)) * UNITS[match.group(2).lower()]
+
+
+DURATION = re.compile(r'^(\d+(?:\.\d+)?)\s*(ms|s|m|h|d)?$')
+DURATION_UNITS = {'ms': 0.001, 's': 1, 'm': 60, 'h': 3600, 'd': 86400, None: 1}
+
+
+# Function to turn "30s", "5m", "1.5h" or "90" (seconds) into seconds
+def parse_duration(text):
+    match = DURATION.match(text.strip().lower())
+    if not match:
+        raise ValueError(f"Invalid duration '{text}' (expected e.g. 30s, 5m or 1h)")
+    return float(match.group(1)) * DURATION_UNITS[match.group(2)]
+
+
+# Function to compile one "field op value" expression into (row key, cost, predicate)
+def compile_expression(expression):
+    match = EXPRESSION.match(expression)
+    if not match:
+        raise ValueError(f"Invalid filter '{expression}' (expected e.g. name~gunicorn, user=svc, rss>500MB)")
+    field, op, value = match.groups()
+    if field.lower() not in FILTER_FIELDS:
+        raise ValueError(f"Unknown filter field '{field}' (choose from {', '.join(FILTER_FIELDS)})")
+    key, cost = FILTER_FIELDS[field.lower()]
+
+    if op in ('~', '!~'):
+        pattern = re.compile(value)  # compiled once, reused for every process
+        if op == '~':
+            return key, cost, lambda row: row[key] is not None and pattern.search(row[key]) is not None
+        return key, cost, lambda row: row[key] is None or pattern.search(row[key]) is None
+
+    compare = OPERATORS[op]
+    if key in STRING_FIELDS:
+        if op not in ('=', '!='):
+            raise ValueError(f"'{field}' only supports =, !=, ~ and !~")
+        return key, cost, lambda row: compare(row[key], value)
+    number = parse_number(value)
+    return key, cost, lambda row: row[key] is not None and compare(row[key], number)
+
+
+class ProcessFilter:
+    """A --where filter compiled once and evaluated cheapest stage first.
+
+    Stage 1 uses what process_iter already fetched, stage 2 looks up the user,
+    and only processes that survive both get their expensive metrics collected.
+    """
+
+    def __init__(self, expressions):
+        self.stages = {'cheap': [], 'lookup': [], 'expensive': []}
+        self.prefetch = set()       # process_iter attributes the cheap stage reads
+        self.metric_fields = set()  # metrics the expensive stage needs
+        for expression in expressions:
+            key, cost, predicate = compile_expression(expression)
+            self.stages[cost].append(predicate)
+            if key == 'ppid':
+                self.prefetch.add(key)
+            elif cost == 'expensive':
+                self.metric_fields.add(key)
+        self.needs_user = bool(self.stages['lookup'])
+
+    def accepts(self, row, stage):
+        return all(predicate(row) for predicate in self.stages[stage])
+
+    def accepts_all(self, row):
+        return all(self.accepts(row, stage) for stage in self.stages)
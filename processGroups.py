@@ -0,0 +1,78 @@
+import heapq
+
+GROUP_BY = ('name', 'parent', 'user')
+
+# Columns of a grouped result, in output order
+GROUP_FIELDS = ('group', 'processes', 'cpu_percent', 'memory_percent', 'disk_usage', 'net_usage')
+SUMMED_FIELDS = ('cpu_percent', 'memory_percent', 'disk_usage', 'net_usage')
+
+
+class GroupIndex:
+    """Per-group totals plus the ppid -> children index, built in one pass over a snapshot."""
+
+    def __init__(self, group_by):
+        if group_by not in GROUP_BY:
+            raise ValueError(f"Unknown grouping '{group_by}'")
+        self.group_by = group_by
+        self.groups = {}     # key -> totals row, with the member rows under 'members'
+        self.children = {}   # ppid -> [row, ...]
+        self.names = {}      # pid -> name, to label parent groups
+
+    # Function to fold one process row into its group and the children index
+    def add(self, row):
+        pid = row['pid']
+        ppid = row.get('ppid')
+        self.names[pid] = row['name']
+        self.children.setdefault(ppid, []).append(row)
+
+        if self.group_by == 'name':
+            key = row['name']
+        elif self.group_by == 'user':
+            key = row.get('username')
+        else:
+            key = ppid
+
+        group = self.groups.get(key)
+        if group is None:
+            group = self.groups[key] = {'key': key, 'processes': 0, 'members': []}
+            for field in SUMMED_FIELDS:
+                group[field] = 0
+        group['processes'] += 1
+        for field in SUMMED_FIELDS:
+            group[field] += row[field]
+        group['members'].append(row)
+
+    # Function to fold a whole snapshot; returns self for chaining
+    def add_all(self, rows):
+        for row in rows:
+            self.add(row)
+        return self
+
+    # Function to label a group for output (parent groups show the parent's name)
+    def label(self, group):
+        if self.group_by == 'parent':
+            return f"{self.names.get(group['key'], '?')} ({group['key']})"
+        return str(group['key'])
+
+    # Function to rank groups by a summed field, or by process count when none is given
+    def top(self, sort_field=None, top=10):
+        field = sort_field or 'processes'
+        ranked = heapq.nlargest(top, self.groups.values(), key=lambda group: group[field])
+        for group in ranked:
+            group['group'] = self.label(group)
+        return ranked
+
+    # Function to yield (depth, row) for a group's biggest members and their descendants
+    def expand(self, group, sort_field=None, limit=5, max_depth=3):
+        field = sort_field or 'memory_percent'
+        stack = [(1, row) for row in reversed(heapq.nlargest(limit, group['members'], key=lambda r: r[field]))]
+        seen = set()
+        while stack:
+            depth, row = stack.pop()
+            if row['pid'] in seen:
+                continue
+            seen.add(row['pid'])
+            yield depth, row
+            if depth < max_depth:
+                kids = heapq.nlargest(limit, self.children.get(row['pid'], ()), key=lambda r: r[field])
+                stack.extend((depth + 1, kid) for kid in reversed(kids))
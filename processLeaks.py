@@ -0,0 +1,91 @@
+import heapq
+import math
+
+LEAK_FIELDS = ('pid', 'name', 'samples', 'memory', 'growth', 'growth_low', 'r2')
+CONFIDENCE_Z = 2.0   # standard errors below the slope for the "at least" rate (about 95%)
+MIN_SAMPLES = 3      # a line through two points has no variance to judge it by
+
+
+class LeakStats:
+    """Online least-squares fit of memory against time for one process.
+
+    Only the means and co-moments are kept (Welford's update), so the state is the
+    same handful of floats after ten samples or ten thousand, and stays accurate
+    where raw sums of squares would cancel out.
+    """
+
+    __slots__ = ('name', 'n', 'mean_t', 'mean_y', 'c_tt', 'c_ty', 'c_yy', 'last')
+
+    def __init__(self, name):
+        self.name = name
+        self.n = 0
+        self.mean_t = self.mean_y = 0.0
+        self.c_tt = self.c_ty = self.c_yy = 0.0
+        self.last = 0
+
+    def add(self, t, y):
+        self.n += 1
+        dt = t - self.mean_t
+        dy = y - self.mean_y
+        self.mean_t += dt / self.n
+        self.mean_y += dy / self.n
+        self.c_tt += dt * (t - self.mean_t)
+        self.c_ty += dt * (y - self.mean_y)
+        self.c_yy += dy * (y - self.mean_y)
+        self.last = y
+
+    def fit(self):
+        """Return (slope in bytes/s, its standard error, r²), or None before MIN_SAMPLES."""
+        if self.n < MIN_SAMPLES or self.c_tt <= 0:
+            return None
+        slope = self.c_ty / self.c_tt
+        residual = max(self.c_yy - slope * self.c_ty, 0.0)
+        error = math.sqrt(residual / (self.n - 2) / self.c_tt)
+        r2 = slope * self.c_ty / self.c_yy if self.c_yy > 0 else 0.0
+        return slope, error, r2
+
+
+class LeakDetector:
+    """Per-process memory trends over a run, ranked by the growth rate they sustain.
+
+    Processes are keyed by (pid, create time), so a reused pid starts a fresh fit,
+    and processes missing from a tick (they exited) are dropped. The ranking uses
+    the slope minus CONFIDENCE_Z standard errors: a steady climb beats a noisier
+    one with the same average slope, and a spike that falls back ranks nowhere.
+    """
+
+    def __init__(self):
+        self.stats = {}  # (pid, create_time) -> LeakStats
+        self.start = None
+
+    # Function to add one tick of (pid, create_time, name, memory bytes) samples
+    def update(self, samples, now):
+        if self.start is None:
+            self.start = now
+        t = now - self.start  # small offsets keep the co-moments precise
+        stats = self.stats
+        seen = set()
+        for pid, created, name, memory in samples:
+            key = (pid, created)
+            seen.add(key)
+            entry = stats.get(key)
+            if entry is None:
+                entry = stats[key] = LeakStats(name)
+            entry.add(t, memory)
+        for key in stats.keys() - seen:
+            del stats[key]
+
+    def top(self, count=10):
+        """Return the `count` processes growing fastest with confidence, as rows with rates in bytes/hour."""
+        rows = []
+        for (pid, _), entry in self.stats.items():
+            fit = entry.fit()
+            if fit is None:
+                continue
+            slope, error, r2 = fit
+            low = slope - CONFIDENCE_Z * error
+            if low <= 0:
+                continue
+            rows.append({'pid': pid, 'name': entry.name, 'samples': entry.n, 'memory': entry.last,
+                         'growth': slope * 3600, 'growth_low': low * 3600, 'r2': r2})
+        return heapq.nlargest(count, rows, key=lambda row: row['growth_low'])
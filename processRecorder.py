@@ -0,0 +1,124 @@
+import heapq
+import mmap
+import os
+import struct
+
+# File layout: one header, then `capacity` fixed-width records used as a ring
+HEADER = struct.Struct('<8sQQQ')    # magic, capacity, record size, records written so far
+RECORD = struct.Struct('<dIfQQ')    # timestamp, pid, cpu %, rss bytes, disk bytes/s
+MAGIC = b'RTREC001'
+COUNT_OFFSET = 24                   # offset of "records written" inside the header
+
+
+class RingRecorder:
+    """Appends process samples to a preallocated, memory-mapped ring-buffer file.
+
+    The file never grows past HEADER.size + capacity * RECORD.size bytes; once it
+    is full the oldest records are overwritten.
+    """
+
+    def __init__(self, path, capacity=1_000_000):
+        self.path = path
+        if not os.path.exists(path) or os.path.getsize(path) < HEADER.size:
+            with open(path, 'wb') as f:
+                f.write(HEADER.pack(MAGIC, capacity, RECORD.size, 0))
+                f.truncate(HEADER.size + capacity * RECORD.size)
+        self.file = open(path, 'r+b')
+        self.map = mmap.mmap(self.file.fileno(), 0)
+        magic, self.capacity, record_size, self.count = HEADER.unpack_from(self.map)
+        if magic != MAGIC or record_size != RECORD.size:
+            self.close()
+            raise ValueError(f"{path} is not a process recording")
+
+    # Function to append one tick worth of rows (as produced by ProcessTracker.sample)
+    def append(self, timestamp, rows):
+        pack_into = RECORD.pack_into
+        count = self.count
+        for row in rows:
+            offset = HEADER.size + (count % self.capacity) * RECORD.size
+            pack_into(self.map, offset, timestamp, row['pid'], row['cpu_percent'], row['rss'], int(row['disk_usage']))
+            count += 1
+        self.count = count
+        struct.pack_into('<Q', self.map, COUNT_OFFSET, count)  # publish after the records are in place
+
+    def close(self):
+        self.map.close()
+        self.file.close()
+
+
+class RingReader:
+    """Read-only view over a recording; queries unpack records straight from the mapping."""
+
+    def __init__(self, path):
+        self.file = open(path, 'rb')
+        self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.capacity, record_size, self.count = HEADER.unpack_from(self.map)
+        if magic != MAGIC or record_size != RECORD.size:
+            self.close()
+            raise ValueError(f"{path} is not a process recording")
+        self.size = min(self.count, self.capacity)       # records still held
+        self.first = self.count - self.size              # logical index of the oldest one
+
+    def close(self):
+        self.map.close()
+        self.file.close()
+
+    # Function to map a logical record index to its byte offset in the file
+    def offset(self, index):
+        return HEADER.size + (index % self.capacity) * RECORD.size
+
+    def timestamp(self, index):
+        return struct.unpack_from('<d', self.map, self.offset(index))[0]
+
+    # Function to find the first logical index whose timestamp is >= t (records are time-ordered)
+    def bisect(self, t):
+        low, high = self.first, self.count
+        while low < high:
+            mid = (low + high) // 2
+            if self.timestamp(mid) < t:
+                low = mid + 1
+            else:
+                high = mid
+        return low
+
+    # Function to yield records between two times without copying the file
+    def records(self, since=None, until=None):
+        start = self.first if since is None else self.bisect(since)
+        stop = self.count if until is None else self.bisect(until)
+        view = memoryview(self.map)
+        try:
+            # The range is at most two contiguous slices of the ring
+            while start < stop:
+                chunk = min(stop - start, self.capacity - start % self.capacity)
+                offset = self.offset(start)
+                yield from RECORD.iter_unpack(view[offset:offset + chunk * RECORD.size])
+                start += chunk
+        finally:
+            view.release()
+
+    # Function to rank pids over a time range: mean CPU, peak RSS or mean disk rate
+    def top(self, order_by='cpu', top=10, since=None, until=None):
+        stats = {}
+        for timestamp, pid, cpu, rss, disk in self.records(since, until):
+            entry = stats.get(pid)
+            if entry is None:
+                stats[pid] = [1, cpu, rss, disk, timestamp, timestamp]
+            else:
+                entry[0] += 1
+                entry[1] += cpu
+                if rss > entry[2]:
+                    entry[2] = rss
+                entry[3] += disk
+                entry[5] = timestamp
+
+        rows = [{
+            'pid': pid,
+            'samples': samples,
+            'cpu_percent': cpu / samples,
+            'peak_rss': rss,
+            'disk_usage': disk / samples,
+            'first_seen': first,
+            'last_seen': last,
+        } for pid, (samples, cpu, rss, disk, first, last) in stats.items()]
+        sort_field = {'memory': 'peak_rss', 'disk': 'disk_usage'}.get(order_by, 'cpu_percent')
+        return heapq.nlargest(top, rows, key=lambda row: row[sort_field])
@@ -0,0 +1,119 @@
+import tkinter as tk
+from tkinter import ttk
+
+# (row key, heading, width, formatter)
+COLUMNS = (
+    ('pid', "PID", 70, str),
+    ('name', "Name", 200, str),
+    ('cpu_percent', "CPU %", 70, lambda value: f"{value:.1f}"),
+    ('memory_percent', "Memory %", 80, lambda value: f"{value:.2f}"),
+    ('disk_usage', "Disk B/s", 100, lambda value: f"{value:,.0f}"),
+    ('net_usage', "IO ops/s", 80, lambda value: f"{value:,.0f}"),
+)
+
+
+class ProcessTable:
+    """Sortable Treeview over a list of process rows that only renders the rows in view.
+
+    The Treeview holds a fixed set of slot items, one per visible line. Scrolling
+    and refreshes rewrite only the slots whose text changed, so thousands of rows
+    cost no more to display than a screenful.
+    """
+
+    def __init__(self, parent, visible_rows=20):
+        self.visible_rows = visible_rows
+        self.rows = []
+        self.offset = 0
+        self.sort_field = 'cpu_percent'
+        self.descending = True
+
+        self.frame = tk.Frame(parent)
+        self.tree = ttk.Treeview(self.frame, columns=[key for key, *_ in COLUMNS], show='headings',
+                                 height=visible_rows, selectmode='browse')
+        for key, heading, width, _ in COLUMNS:
+            self.tree.heading(key, text=heading, command=lambda field=key: self.sort_by(field))
+            self.tree.column(key, width=width, anchor='w' if key == 'name' else 'e')
+        self.scrollbar = ttk.Scrollbar(self.frame, orient='vertical', command=self.on_scrollbar)
+        self.tree.pack(side='left', fill='both', expand=True)
+        self.scrollbar.pack(side='right', fill='y')
+
+        # Fixed slot items; self.shown remembers what each slot currently displays
+        self.slots = [self.tree.insert('', 'end', values=()) for _ in range(visible_rows)]
+        self.shown = [None] * visible_rows
+        self.attached = visible_rows
+
+        for sequence in ("<MouseWheel>", "<Button-4>", "<Button-5>"):
+            self.tree.bind(sequence, self.on_wheel)
+        self.update_headings()
+
+    def pack(self, **kwargs):
+        self.frame.pack(**kwargs)
+
+    # Function to replace the data set (e.g. after a refresh) and redraw what changed
+    def set_rows(self, rows):
+        self.rows = rows
+        self.sort_rows()
+        self.render()
+
+    def sort_rows(self):
+        self.rows.sort(key=lambda row: row[self.sort_field], reverse=self.descending)
+
+    # Function called by a heading click: same column flips the order
+    def sort_by(self, field):
+        if field == self.sort_field:
+            self.descending = not self.descending
+        else:
+            self.sort_field = field
+            self.descending = field not in ('pid', 'name')
+        self.update_headings()
+        self.sort_rows()
+        self.render()
+
+    def update_headings(self):
+        arrow = " ▼" if self.descending else " ▲"
+        for key, heading, *_ in COLUMNS:
+            self.tree.heading(key, text=heading + (arrow if key == self.sort_field else ""))
+
+    def scroll_to(self, offset):
+        self.offset = max(0, min(offset, len(self.rows) - self.visible_rows))
+        self.render()
+
+    def on_scrollbar(self, action, amount, unit=None):
+        if action == 'moveto':
+            self.scroll_to(int(float(amount) * len(self.rows)))
+        else:
+            step = self.visible_rows if unit == 'pages' else 1
+            self.scroll_to(self.offset + int(amount) * step)
+
+    def on_wheel(self, event):
+        if event.num == 4 or getattr(event, 'delta', 0) > 0:
+            self.scroll_to(self.offset - 3)
+        else:
+            self.scroll_to(self.offset + 3)
+        return "break"
+
+    # Function to write the visible window of rows into the slot items, touching only changed slots
+    def render(self):
+        self.offset = max(0, min(self.offset, len(self.rows) - self.visible_rows))
+        window = self.rows[self.offset:self.offset + self.visible_rows]
+
+        # Hide slots past the end of short data sets, bring them back when rows return
+        if len(window) < self.attached:
+            for slot in self.slots[len(window):self.attached]:
+                self.tree.detach(slot)
+        elif len(window) > self.attached:
+            for index in range(self.attached, len(window)):
+                self.tree.move(self.slots[index], '', index)
+        self.attached = len(window)
+
+        for index, row in enumerate(window):
+            values = tuple(formatter(row[key]) for key, _, _, formatter in COLUMNS)
+            if self.shown[index] != values:
+                self.tree.item(self.slots[index], values=values)
+                self.shown[index] = values
+
+        total = len(self.rows)
+        if total:
+            self.scrollbar.set(self.offset / total, (self.offset + len(window)) / total)
+        else:
+            self.scrollbar.set(0, 1)
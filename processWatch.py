@@ -0,0 +1,111 @@
+import heapq
+import time
+
+import psutil
+
+
+class TrackedProcess:
+    """A cached psutil.Process plus the counters from its previous sample."""
+
+    __slots__ = ('proc', 'name', 'cpu_time', 'io_bytes', 'io_count', 'sampled_at')
+
+    def __init__(self, proc):
+        self.proc = proc
+        self.name = None
+        self.cpu_time = None
+        self.io_bytes = None
+        self.io_count = None
+        self.sampled_at = None
+
+
+class ProcessTracker:
+    """Keeps psutil.Process objects alive between ticks so CPU% and IO rates come from real deltas.
+
+    Only processes that started or exited since the last tick are created or dropped.
+    A process is identified by (pid, create time), as in processLeaks: psutil's
+    is_running() compares the two, and a pid that was reused in between is dropped
+    and picked up again as a new process on the next tick.
+    """
+
+    def __init__(self):
+        self.tracked = {}
+
+    # Function to add new pids and drop exited ones; returns (started, exited) counts
+    def refresh_pids(self):
+        current = set(psutil.pids())
+        known = self.tracked.keys()
+        exited = known - current
+        started = current - known
+        for pid in exited:
+            del self.tracked[pid]
+        for pid in started:
+            try:
+                self.tracked[pid] = TrackedProcess(psutil.Process(pid))
+            except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
+                pass
+        return len(started), len(exited)
+
+    # Function to sample every tracked process and return rows with per-second rates
+    def sample(self):
+        self.refresh_pids()
+        total_memory = psutil.virtual_memory().total  # once per tick, not once per process
+        rows = []
+        gone = []
+
+        for pid, entry in self.tracked.items():
+            proc = entry.proc
+            # cpu_times(), memory_info() and io_counters() don't check for pid reuse; is_running() does
+            if not proc.is_running():
+                gone.append(pid)
+                continue
+            try:
+                with proc.oneshot():
+                    now = time.monotonic()
+                    if entry.name is None:
+                        entry.name = proc.name()
+                    cpu_times = proc.cpu_times()
+                    rss = proc.memory_info().rss
+                    try:
+                        io_counters = proc.io_counters()
+                    except (psutil.AccessDenied, AttributeError):
+                        io_counters = None
+            except psutil.NoSuchProcess:
+                gone.append(pid)
+                continue
+            except (psutil.AccessDenied, psutil.ZombieProcess):
+                continue
+
+            cpu_time = cpu_times.user + cpu_times.system
+            io_bytes = io_counters.read_bytes + io_counters.write_bytes if io_counters else 0
+            io_count = io_counters.read_count + io_counters.write_count if io_counters else 0
+
+            cpu_percent = disk_rate = net_rate = 0.0
+            if entry.sampled_at is not None:
+                elapsed = now - entry.sampled_at
+                if elapsed > 0:
+                    cpu_percent = (cpu_time - entry.cpu_time) / elapsed * 100
+                    disk_rate = (io_bytes - entry.io_bytes) / elapsed
+                    net_rate = (io_count - entry.io_count) / elapsed
+
+            entry.cpu_time = cpu_time
+            entry.io_bytes = io_bytes
+            entry.io_count = io_count
+            entry.sampled_at = now
+
+            rows.append({
+                'pid': pid,
+                'name': entry.name,
+                'cpu_percent': cpu_percent,
+                'memory_percent': rss / total_memory * 100,
+                'rss': rss,
+                'disk_usage': disk_rate,
+                'net_usage': net_rate,
+            })
+
+        for pid in gone:
+            del self.tracked[pid]
+        return rows
+
+    # Function to sample and keep the top N rows by the chosen metric
+    def top(self, sort_field='cpu_percent', top=10):
+        return heapq.nlargest(top, self.sample(), key=lambda row: row[sort_field])
@@ -0,0 +1,216 @@
+import contextlib
+import os
+import random
+from collections import namedtuple
+
+# Shapes of the psutil results the tools read
+pio = namedtuple('pio', 'read_count write_count read_bytes write_bytes')
+pmem = namedtuple('pmem', 'rss vms')
+pcputimes = namedtuple('pcputimes', 'user system')
+
+TITLE_WORDS = ("README.md", "output.txt", "Inbox", "Pull request #42", "Dashboard", "main.py", "Terminal",
+               "Spotify", "Settings", "Untitled", "Meeting notes", "build log", "Calendar", "Photos")
+APP_NAMES = ("Visual Studio Code", "Google Chrome", "Notepad", "Firefox", "Slack", "Explorer", "Outlook")
+
+
+class FakeError(Exception):
+    def __init__(self, pid=None, name=None, msg=None):
+        super().__init__(msg or f"pid {pid}")
+        self.pid = pid
+
+
+class FakeNoSuchProcess(FakeError):
+    pass
+
+
+class FakeZombieProcess(FakeNoSuchProcess):
+    pass
+
+
+class FakeAccessDenied(FakeError):
+    pass
+
+
+class FakeProcess:
+    """Enough of psutil.Process for the lw code paths, with scripted failures."""
+
+    def __init__(self, pid, name, ppid, username, rss, cpu, io, fate=None):
+        self.pid = pid
+        self._name = name
+        self._ppid = ppid
+        self._username = username
+        self._rss = rss
+        self._cpu = cpu
+        self._io = io
+        self._fate = fate   # None, 'denied' (io_counters), 'zombie' or 'gone' (every metric)
+        self.info = {}
+
+    @contextlib.contextmanager
+    def oneshot(self):
+        yield
+
+    def _check(self):
+        if self._fate == 'zombie':
+            raise FakeZombieProcess(self.pid)
+        if self._fate == 'gone':
+            raise FakeNoSuchProcess(self.pid)
+
+    def name(self):
+        return self._name
+
+    def ppid(self):
+        return self._ppid
+
+    def username(self):
+        return self._username
+
+    def cpu_percent(self, interval=None):
+        self._check()
+        return self._cpu
+
+    def cpu_times(self):
+        self._check()
+        return pcputimes(self._cpu, self._cpu / 4)
+
+    def memory_info(self):
+        self._check()
+        return pmem(self._rss, self._rss * 3)
+
+    def memory_percent(self):
+        self._check()
+        return self._rss / FakePsutil.TOTAL_MEMORY * 100
+
+    def io_counters(self):
+        self._check()
+        if self._fate == 'denied':
+            raise FakeAccessDenied(self.pid)
+        return self._io
+
+
+class FakePsutil:
+    """A stand-in for the psutil module over a synthetic process table."""
+
+    TOTAL_MEMORY = 16 * 1024 ** 3
+    Error = FakeError
+    NoSuchProcess = FakeNoSuchProcess
+    ZombieProcess = FakeZombieProcess
+    AccessDenied = FakeAccessDenied
+
+    def __init__(self, processes):
+        self.processes = processes
+        self.by_pid = {proc.pid: proc for proc in processes}
+
+    def process_iter(self, attrs=None):
+        for proc in self.processes:
+            if proc._fate == 'gone':
+                continue  # exited before enumeration reached it
+            proc.info = {attr: getattr(proc, attr)() if attr != 'pid' else proc.pid for attr in attrs or ()}
+            yield proc
+
+    def pids(self):
+        return [proc.pid for proc in self.processes if proc._fate != 'gone']
+
+    def Process(self, pid):
+        proc = self.by_pid.get(pid)
+        if proc is None or proc._fate == 'gone':
+            raise FakeNoSuchProcess(pid)
+        return proc
+
+
+# Function to build a synthetic process table with a share of AccessDenied, zombie and vanished processes
+def make_process_table(count, denied=0.2, zombies=0.01, gone=0.01, seed=0):
+    rng = random.Random(seed)
+    services = [f"worker-{index}" for index in range(max(1, count // 50))]
+    users = ["root", "svc", "www-data", "postgres", "apry"]
+    processes = []
+    for pid in range(1, count + 1):
+        roll = rng.random()
+        if roll < zombies:
+            fate = 'zombie'
+        elif roll < zombies + gone:
+            fate = 'gone'
+        elif roll < zombies + gone + denied:
+            fate = 'denied'
+        else:
+            fate = None
+        reads, writes = rng.randrange(10 ** 6), rng.randrange(10 ** 6)
+        processes.append(FakeProcess(
+            pid=pid,
+            name=rng.choice(services),
+            ppid=rng.randrange(1, pid) if pid > 1 else 0,
+            username=rng.choice(users),
+            rss=rng.randrange(10 ** 6, 2 * 10 ** 9),
+            cpu=round(rng.random() * 100, 1),
+            io=pio(reads, writes, reads * 4096, writes * 4096),
+            fate=fate,
+        ))
+    return FakePsutil(processes)
+
+
+# Function to build `count` plausible window titles, some long and some blank
+def make_window_titles(count, seed=0):
+    rng = random.Random(seed)
+    titles = []
+    for _ in range(count):
+        roll = rng.random()
+        if roll < 0.05:
+            titles.append(" ")
+        elif roll < 0.15:
+            # Browser-style titles that run to a few hundred characters
+            titles.append(" - ".join(rng.choice(TITLE_WORDS) for _ in range(rng.randrange(10, 40))))
+        else:
+            titles.append(f"{rng.choice(TITLE_WORDS)} - {rng.choice(APP_NAMES)}")
+    return titles
+
+
+LOG_ERRORS = ("FileNotFoundError: [Errno 2] No such file or directory: 'data/cache.json'",
+              "ConnectionResetError: [Errno 104] Connection reset by peer",
+              "PermissionError: [Errno 13] Permission denied: '/var/log/app.log'",
+              "OSError: [Errno 28] No space left on device",
+              "KeyError: 'session_id'",
+              "psycopg2.OperationalError: server closed the connection unexpectedly")
+
+
+# Function to build `count` service log lines (as bytes, newline-terminated), a share of them errors
+def make_log_lines(count, error_rate=0.02, seed=0):
+    rng = random.Random(seed)
+    lines = []
+    for number in range(count):
+        stamp = f"2024-05-01T14:{number // 60000 % 60:02d}:{number // 1000 % 60:02d}.{number % 1000:03d}Z"
+        if rng.random() < error_rate:
+            lines.append(f"{stamp} ERROR worker-{rng.randrange(16)} {rng.choice(LOG_ERRORS)}\n".encode())
+        else:
+            lines.append(f"{stamp} INFO  worker-{rng.randrange(16)} GET /api/items/{rng.randrange(10 ** 6)} "
+                         f"200 {rng.randrange(1, 500)}ms\n".encode())
+    return lines
+
+
+# Function to write a fake /proc tree with `count` processes (stat, statm and io per pid)
+def make_fake_proc(root, count):
+    with open(os.path.join(root, 'meminfo'), 'w') as f:
+        f.write("MemTotal:       16384000 kB\nMemFree:         8192000 kB\n")
+    with open(os.path.join(root, 'uptime'), 'w') as f:
+        f.write("100000.00 350000.00\n")
+    for pid in range(1, count + 1):
+        pid_dir = os.path.join(root, str(pid))
+        os.mkdir(pid_dir)
+        with open(os.path.join(pid_dir, 'stat'), 'w') as f:
+            f.write(f"{pid} (worker {pid}) S 1 {pid} {pid} 0 -1 4194304 100 0 0 0 "
+                    f"{pid * 7 % 5000} {pid * 3 % 2000} 0 0 20 0 1 0 {pid * 11} 123456789 {pid % 4000} "
+                    "18446744073709551615 1 1 0 0 0 0 0 0 0 0 0 0 17 0 0 0 0 0 0\n")
+        with open(os.path.join(pid_dir, 'statm'), 'w') as f:
+            f.write(f"{pid % 9000 + 1000} {pid % 4000 + 100} 300 10 0 500 0\n")
+        with open(os.path.join(pid_dir, 'io'), 'w') as f:
+            f.write(f"rchar: {pid * 100}\nwchar: {pid * 50}\nsyscr: {pid % 700}\nsyscw: {pid % 300}\n"
+                    f"read_bytes: {pid * 4096 % 10 ** 9}\nwrite_bytes: {pid * 512}\ncancelled_write_bytes: 0\n")
+
+
+# Function to temporarily replace a module attribute (e.g. listWindows.psutil)
+@contextlib.contextmanager
+def patched(module, name, value):
+    original = getattr(module, name)
+    setattr(module, name, value)
+    try:
+        yield value
+    finally:
+        setattr(module, name, original)
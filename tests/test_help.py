@@ -0,0 +1,26 @@
+import help
+
+
+def test_help_for_a_command_shows_its_usage(capsys):
+    help.main(['lw'])
+    out = capsys.readouterr().out
+    assert "Help for 'lw'" in out
+    assert "python main.py lw --replay" in out
+    assert "No specific help" not in out
+
+
+def test_help_for_an_error_shows_its_advice(capsys, monkeypatch):
+    monkeypatch.setattr(help, 'get_user_confirmation', lambda prompt="": False)
+    help.main(["KeyError: 'name'"])
+    assert "Error Detected: KeyError" in capsys.readouterr().out
+
+
+def test_scan_options_in_any_order(tmp_path, capsys):
+    log = tmp_path / 'app.log'
+    log.write_text("ok\nKeyError: 'a'\nok\nKeyError: 'b'\nValueError: bad\n")
+
+    help.main(['--samples', '1', '--scan', str(log), '-f', 'csv'])
+    out = capsys.readouterr().out
+    assert out.splitlines()[0] == "error,count,first_line,last_line,help,samples"
+    assert "KeyError,2,2,4,True,KeyError: 'a'" in out
+    assert "No specific help" not in out
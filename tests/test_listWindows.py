@@ -0,0 +1,54 @@
+import io
+import socket
+
+import pytest
+
+import listWindows
+
+
+def fail_input(prompt=""):
+    raise AssertionError("prompted without a terminal")
+
+
+def test_finish_output_skips_the_prompt_without_a_terminal(tmp_path, monkeypatch, capsys):
+    monkeypatch.setattr('sys.stdin', io.StringIO())
+    monkeypatch.setattr('builtins.input', fail_input)
+    output = tmp_path / 'output.txt'
+    output.write_text("1 process\n")
+
+    listWindows.finish_output(str(output), "Top processes")
+    assert capsys.readouterr().out == f"Top processes written to {output}\n"
+
+
+def test_host_query_fails_when_no_host_answers():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        refused = sock.getsockname()[1]
+    with pytest.raises(ConnectionError, match="none of the 1 host"):
+        listWindows.display_host_processes([('127.0.0.1', refused)], output_file='-', timeout=0.5)
+
+
+def test_bad_replay_times_are_usage_errors(tmp_path, capsys):
+    for option in ('--since', '--until'):
+        with pytest.raises(SystemExit) as exit_info:
+            listWindows.main(['--replay', str(tmp_path / 'history.bin'), option, 'garbage'])
+        assert exit_info.value.code == 2
+        assert "ISO-8601" in capsys.readouterr().err
+
+
+def test_parse_time_accepts_epoch_and_iso():
+    assert listWindows.parse_time("1714572000") == 1714572000.0
+    assert listWindows.parse_time("2024-05-01T14:00+00:00") == 1714572000.0
+    assert listWindows.parse_time(None) is None
+
+
+def test_accurate_text_output_shows_rss_pss_and_uss(monkeypatch, capsys):
+    row = {'pid': 7, 'name': 'worker', 'cpu_percent': 1.0, 'memory_percent': 2.0, 'disk_usage': 0, 'net_usage': 0,
+           'rss': 3000, 'pss': 2000, 'uss': 1000}
+    hidden = dict(row, pid=8, pss=None, uss=None)
+    monkeypatch.setattr(listWindows, 'get_top_processes', lambda *args: [row, hidden])
+
+    listWindows.display_top_processes('memory', output_file='-', top=2, accurate=True)
+    lines = capsys.readouterr().out.splitlines()
+    assert lines[2].endswith("RSS: 3,000 bytes, PSS: 2,000 bytes, USS: 1,000 bytes")
+    assert lines[3].endswith("RSS: 3,000 bytes, PSS: n/a, USS: n/a")
@@ -0,0 +1,82 @@
+import os
+from types import SimpleNamespace
+
+from openwindows import arrange_windows
+from windowBackends import FakeWindowBackend
+
+# Stands in for a Popen: launched_pids() only reads .pid, and this process is certain to exist
+LAUNCHED = [SimpleNamespace(pid=os.getpid())]
+OTHER_PID = -1
+
+
+class AppearingBackend(FakeWindowBackend):
+    """Fake backend where queued batches of windows appear one list_windows() call at a time."""
+
+    def __init__(self, windows=(), batches=(), screen=(1000, 800)):
+        super().__init__(windows, screen)
+        self.batches = list(batches)
+        self.polls = []  # round trips made by each poll, filled in as the next one starts
+
+    def list_windows(self):
+        self.polls.append(self.round_trips)
+        if self.batches:
+            for handle, title, pid in self.batches.pop(0):
+                self.add_window(handle, title, pid)
+        return super().list_windows()
+
+
+def arrange(backend, expected, titles=("report.txt",), known_handles=(), timeout=1.0):
+    return arrange_windows(backend, LAUNCHED, expected, list(titles), set(known_handles), timeout,
+                           initial_delay=0, max_delay=0)
+
+
+def test_matches_windows_by_pid_and_skips_others():
+    pid = os.getpid()
+    backend = AppearingBackend(batches=[[(1, "untitled", pid), (2, "someone else", OTHER_PID), (3, "untitled", pid)]])
+
+    assert arrange(backend, 2) == 2
+    assert backend.windows[1]['geometry'] == (0, 0, 1000, 400)
+    assert backend.windows[3]['geometry'] == (0, 400, 1000, 400)
+    assert backend.windows[2]['geometry'] is None
+
+
+def test_falls_back_to_the_title_for_windows_of_other_processes():
+    backend = AppearingBackend(batches=[[(1, "report.txt - Notepad", OTHER_PID)]])
+    assert arrange(backend, 1) == 1
+    assert backend.windows[1]['geometry'] == (0, 0, 1000, 800)
+
+
+def test_ignores_windows_that_were_already_open():
+    pid = os.getpid()
+    backend = AppearingBackend(windows=[(1, "report.txt - Notepad", pid)], batches=[[], [(2, "untitled", pid)]])
+    assert arrange(backend, 1, known_handles={1}) == 1
+    assert backend.windows[1]['geometry'] is None
+    assert backend.windows[2]['geometry'] == (0, 0, 1000, 800)
+
+
+def test_places_windows_as_they_appear():
+    pid = os.getpid()
+    backend = AppearingBackend(batches=[[(1, "a", pid)], [], [(2, "b", pid), (3, "c", pid)], [(4, "d", pid)]])
+
+    assert arrange(backend, 4) == 4
+    # 2x2 grid, filled in the order the windows showed up
+    assert [backend.windows[handle]['geometry'] for handle in (1, 2, 3, 4)] == [
+        (0, 0, 500, 400), (500, 0, 500, 400), (0, 400, 500, 400), (500, 400, 500, 400)]
+
+
+def test_round_trips_per_poll_do_not_depend_on_the_window_count():
+    pid = os.getpid()
+    many = [(handle, "untitled", pid) for handle in range(1, 101)]
+    backend = AppearingBackend(batches=[[], many])
+
+    assert arrange(backend, 100) == 100
+    # An empty poll only lists; a poll with new windows lists, looks up pids and moves, each in one batch
+    assert backend.polls == [0, 1]
+    assert backend.round_trips == 1 + 3
+
+
+def test_stops_at_the_timeout_with_the_windows_placed_so_far():
+    pid = os.getpid()
+    backend = AppearingBackend(batches=[[(1, "untitled", pid)]])
+    assert arrange(backend, 3, timeout=0.05) == 1
+    assert backend.windows[1]['geometry'] is not None
@@ -0,0 +1,101 @@
+import asyncio
+import functools
+import socket
+import threading
+
+import pytest
+
+from processAgent import DEFAULT_PORT, SnapshotCache, fetch_host, handle_request, host_label, parse_hosts, query_hosts
+
+
+def row(pid, cpu, memory=1.0):
+    return {'pid': pid, 'name': f"proc{pid}", 'cpu_percent': cpu, 'memory_percent': memory,
+            'disk_usage': 0.0, 'net_usage': 0.0}
+
+
+@pytest.fixture
+def agents():
+    """Starts agents on ephemeral localhost ports; returns start(rows) -> port."""
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    servers = []
+
+    def start(rows):
+        cache = SnapshotCache(lambda: rows)
+        cache.update(rows)
+        server = asyncio.run_coroutine_threadsafe(
+            asyncio.start_server(functools.partial(handle_request, cache), '127.0.0.1', 0), loop).result()
+        servers.append(server)
+        return server.sockets[0].getsockname()[1]
+
+    yield start
+    for server in servers:
+        loop.call_soon_threadsafe(server.close)
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join()
+    loop.close()
+
+
+def closed_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def test_parse_hosts():
+    assert parse_hosts("web1, web2:9000,,[::1]:8000") == [('web1', DEFAULT_PORT), ('web2', 9000), ('::1', 8000)]
+
+
+def test_parse_hosts_ipv6_without_a_port():
+    assert parse_hosts("::1,[fe80::2],10.0.0.3") == [('::1', DEFAULT_PORT), ('fe80::2', DEFAULT_PORT),
+                                                     ('10.0.0.3', DEFAULT_PORT)]
+    for bad in ("[::1", "[::1]x", "[]:80", "web1:http"):
+        with pytest.raises(ValueError):
+            parse_hosts(bad)
+
+
+def test_host_label_round_trips():
+    assert host_label('::1', 8000) == "[::1]:8000"
+    assert host_label('web1') == "web1"
+    assert parse_hosts(host_label('::1', 8000)) == [('::1', 8000)]
+
+
+def test_merges_agents_into_a_global_top_n(agents):
+    first = agents([row(1, 90.0), row(2, 40.0), row(3, 5.0)])
+    second = agents([row(1, 70.0), row(7, 50.0), row(8, 10.0)])
+
+    processes, failures = query_hosts([('127.0.0.1', first), ('127.0.0.1', second)], 'cpu_percent', 4, 2.0)
+    assert failures == []
+    assert [(p['host'], p['pid'], p['cpu_percent']) for p in processes] == [
+        (f"127.0.0.1:{first}", 1, 90.0), (f"127.0.0.1:{second}", 1, 70.0),
+        (f"127.0.0.1:{second}", 7, 50.0), (f"127.0.0.1:{first}", 2, 40.0)]
+
+
+def test_agent_sorts_by_the_requested_field(agents):
+    port = agents([row(1, 90.0, memory=1.0), row(2, 10.0, memory=30.0)])
+    processes, _ = query_hosts([('127.0.0.1', port)], 'memory_percent', 1, 2.0)
+    assert [p['pid'] for p in processes] == [2]
+
+
+def test_failed_agents_are_reported_without_losing_the_others(agents):
+    good = agents([row(1, 12.0)])
+    refused = closed_port()
+    with socket.socket() as silent:  # accepts connections (backlog) but never answers
+        silent.bind(('127.0.0.1', 0))
+        silent.listen()
+        silent_port = silent.getsockname()[1]
+
+        hosts = [('127.0.0.1', refused), ('127.0.0.1', silent_port), ('127.0.0.1', good)]
+        processes, failures = query_hosts(hosts, 'cpu_percent', 10, 0.5)
+
+    assert [p['pid'] for p in processes] == [1]
+    reasons = dict(failures)
+    assert set(reasons) == {f"127.0.0.1:{refused}", f"127.0.0.1:{silent_port}"}
+    assert reasons[f"127.0.0.1:{silent_port}"] == "timed out"
+
+
+def test_agent_rejects_unknown_fields(agents):
+    port = agents([row(1, 12.0)])
+    with pytest.raises(ConnectionError, match="400"):
+        asyncio.run(fetch_host('127.0.0.1', port, 'name', 10, 2.0))
@@ -0,0 +1,68 @@
+from processCgroups import CgroupReader, find_cgroup_root
+
+
+def write(path, text):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text)
+
+
+def make_tree(tmp_path):
+    """A fake /proc with four processes and the cgroup v2 tree they live in."""
+    proc = tmp_path / 'proc'
+    cgroup = tmp_path / 'cgroup'
+    write(cgroup / 'cgroup.controllers', "cpu io memory pids\n")
+
+    memberships = {1: '/', 10: '/system.slice/web.service', 11: '/system.slice/web.service', 20: '/user.slice'}
+    for pid, path in memberships.items():
+        # Hybrid hosts list v1 controllers before the v2 "0::" line
+        write(proc / str(pid) / 'cgroup', f"12:cpuset:/\n1:name=systemd:{path}\n0::{path}\n")
+    (proc / 'self').mkdir()  # not a pid
+
+    # The root group has no memory.current; user.slice has no io controller
+    write(cgroup / 'cpu.stat', "usage_usec 900000000\nuser_usec 1\nsystem_usec 2\n")
+    write(cgroup / 'system.slice' / 'web.service' / 'cpu.stat', "usage_usec 5000000\n")
+    write(cgroup / 'system.slice' / 'web.service' / 'memory.current', "734003200\n")
+    write(cgroup / 'system.slice' / 'web.service' / 'io.stat',
+          "8:0 rbytes=1000 wbytes=200 rios=10 wios=2 dbytes=0 dios=0\n"
+          "259:0 rbytes=30 wbytes=4 rios=3 wios=1 dbytes=0 dios=0\n")
+    write(cgroup / 'user.slice' / 'cpu.stat', "usage_usec 7000\n")
+    write(cgroup / 'user.slice' / 'memory.current', "1048576\n")
+    return CgroupReader(str(cgroup), str(proc)), str(cgroup)
+
+
+def test_find_cgroup_root_skips_v1_mounts(tmp_path):
+    reader, cgroup = make_tree(tmp_path)
+    assert find_cgroup_root((str(tmp_path / 'missing'), cgroup)) == cgroup
+    assert find_cgroup_root((str(tmp_path / 'missing'),)) is None
+
+
+def test_map_processes_counts_pids_per_v2_group(tmp_path):
+    reader, _ = make_tree(tmp_path)
+    assert reader.map_processes() == {'/': 1, '/system.slice/web.service': 2, '/user.slice': 1}
+    # A pid that exited between listing and reading is skipped
+    assert reader.map_processes([10, 99]) == {'/system.slice/web.service': 1}
+
+
+def test_read_group_sums_io_across_devices(tmp_path):
+    reader, _ = make_tree(tmp_path)
+    assert reader.read_group('/system.slice/web.service') == (5000000, 734003200, 1234)
+    assert reader.read_group('/user.slice') == (7000, 1048576, None)
+    assert reader.read_group('/') == (900000000, None, None)
+
+
+def test_missing_controller_sorts_last(tmp_path):
+    reader, _ = make_tree(tmp_path)
+
+    by_memory = reader.top('memory', window=0.01)
+    assert [row['cgroup'] for row in by_memory] == ['/system.slice/web.service', '/user.slice', '/']
+    assert by_memory[-1]['memory'] is None
+
+    by_disk = reader.top('disk_usage', window=0.01)
+    assert by_disk[0]['cgroup'] == '/system.slice/web.service'
+    assert by_disk[0]['disk_usage'] == 0.0  # counters didn't move between the two reads
+    assert {row['disk_usage'] for row in by_disk[1:]} == {None}
+
+    by_count = reader.top(window=0.01)
+    assert by_count[0] == {'cgroup': '/system.slice/web.service', 'processes': 2, 'cpu_percent': 0.0,
+                           'memory': 734003200, 'disk_usage': 0.0}
+    assert len(reader.top(top=1, window=0.01)) == 1
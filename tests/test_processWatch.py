@@ -0,0 +1,32 @@
+import os
+
+from processWatch import ProcessTracker
+
+
+class ReusedPid:
+    """Stands in for a cached psutil.Process whose pid now belongs to another process."""
+
+    def __init__(self, proc):
+        self.pid = proc.pid
+
+    def is_running(self):
+        return False
+
+    def oneshot(self):
+        raise AssertionError("sampled a process whose pid was reused")
+
+
+def test_reused_pid_is_dropped_then_tracked_again():
+    tracker = ProcessTracker()
+    pid = os.getpid()
+    assert any(row['pid'] == pid for row in tracker.sample())
+
+    entry = tracker.tracked[pid]
+    entry.proc = ReusedPid(entry.proc)
+    assert all(row['pid'] != pid for row in tracker.sample())
+    assert pid not in tracker.tracked
+
+    # The next tick picks the pid up as a new process, with no rate against the old one
+    row = next(row for row in tracker.sample() if row['pid'] == pid)
+    assert row['cpu_percent'] == 0.0
+    assert tracker.tracked[pid].proc.is_running()
@@ -0,0 +1,61 @@
+from windowBackends import FakeWindowBackend
+from windowIndex import WindowIndex
+
+
+class RecordingBackend(FakeWindowBackend):
+    """Fake backend that remembers which handles each window_pids call asked about."""
+
+    def __init__(self, windows=()):
+        super().__init__(windows)
+        self.pid_requests = []
+
+    def window_pids(self, handles):
+        self.pid_requests.append(list(handles))
+        return super().window_pids(handles)
+
+
+def test_refresh_indexes_windows_by_pid():
+    backend = RecordingBackend([(1, "editor", 100), (2, "browser", 200), (3, "editor 2", 100)])
+    index = WindowIndex(backend)
+
+    assert index.refresh() == (3, 0)
+    assert [entry['title'] for entry in index.for_pid(100)] == ["editor", "editor 2"]
+    assert index.pids() == {100, 200}
+    assert backend.pid_requests == [[1, 2, 3]]
+
+
+def test_refresh_only_asks_pids_for_new_windows():
+    backend = RecordingBackend([(1, "editor", 100), (2, "browser", 200)])
+    index = WindowIndex(backend)
+    index.refresh()
+
+    backend.add_window(3, "terminal", 300)
+    backend.remove_window(1)
+    assert index.refresh() == (1, 1)
+    assert backend.pid_requests[-1] == [3]
+    assert index.for_pid(100) == []
+    assert index.for_pid(300)[0]['title'] == "terminal"
+
+    # Nothing new: one listing and no pid lookup at all
+    backend.round_trips = 0
+    assert index.refresh() == (0, 0)
+    assert backend.round_trips == 1
+    assert len(backend.pid_requests) == 2
+
+
+def test_refresh_keeps_pid_when_title_changes():
+    backend = RecordingBackend([(1, "page one - browser", 200)])
+    index = WindowIndex(backend)
+    index.refresh()
+
+    backend.windows[1]['title'] = "page two - browser"
+    index.refresh()
+    assert index.titles() == ["page two - browser"]
+    assert index.for_pid(200)[0]['title'] == "page two - browser"
+    assert len(backend.pid_requests) == 1
+
+
+def test_refresh_skips_untitled_windows():
+    index = WindowIndex(FakeWindowBackend([(1, "", 100), (2, "  ", 100), (3, "editor", 100)]))
+    index.refresh()
+    assert index.titles() == ["editor"]
@@ -0,0 +1,128 @@
+import contextlib
+import cProfile
+import json
+import os
+import sys
+import time
+
+# Set to '1' (JSON summary on stderr), a .json path or a .prof path (cProfile dump) to trace every tool
+ENV_VAR = 'RANDOMTOOLS_TRACE'
+
+
+class Tracer:
+    """Named phase timings and counters for one tool run.
+
+    Instrumented code calls phase(), count() and skipped() unconditionally; while
+    no session is active those return immediately, so the hooks cost one
+    attribute check each.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.phases = {}    # name -> [calls, seconds]
+        self.counters = {}  # name -> count
+        self.profiler = None
+        self.started = None
+
+    def reset(self):
+        self.phases = {}
+        self.counters = {}
+        self.profiler = None
+        self.started = time.perf_counter()
+
+    def add_time(self, name, seconds):
+        entry = self.phases.get(name)
+        if entry is None:
+            self.phases[name] = [1, seconds]
+        else:
+            entry[0] += 1
+            entry[1] += seconds
+
+    def count(self, name, amount=1):
+        self.counters[name] = self.counters.get(name, 0) + amount
+
+    def summary(self):
+        return {
+            'total_ms': round((time.perf_counter() - self.started) * 1000, 3),
+            'phases': {name: {'calls': calls, 'ms': round(seconds * 1000, 3)}
+                       for name, (calls, seconds) in self.phases.items()},
+            'counters': dict(sorted(self.counters.items())),
+        }
+
+
+TRACER = Tracer()
+
+
+class _Phase:
+    __slots__ = ('name', 'start')
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        TRACER.add_time(self.name, time.perf_counter() - self.start)
+        return False
+
+
+_NO_PHASE = contextlib.nullcontext()
+
+
+# Function to time a block: `with tracing.phase('sort'):`
+def phase(name):
+    if not TRACER.enabled:
+        return _NO_PHASE
+    return _Phase(name)
+
+
+# Function to bump a named counter (e.g. 'windows.matched')
+def count(name, amount=1):
+    if TRACER.enabled:
+        TRACER.count(name, amount)
+
+
+# Function to count an item dropped by an except branch, keyed by where and the exception type
+def skipped(where, error):
+    if TRACER.enabled:
+        TRACER.count(f"{where}.skipped.{type(error).__name__}")
+
+
+# Function to write the finished trace: a cProfile dump for .prof paths, JSON otherwise ('-' is stderr)
+def write_report(destination):
+    if destination.endswith('.prof'):
+        TRACER.profiler.dump_stats(destination)
+        return
+    report = json.dumps(TRACER.summary(), indent=2)
+    if destination == '-':
+        sys.stderr.write(report + "\n")
+    else:
+        with open(destination, 'w') as f:
+            f.write(report + "\n")
+
+
+# Function to trace everything inside the block when a destination is given (or RANDOMTOOLS_TRACE is set).
+# Nested sessions (main.py dispatching a tool that also takes --profile) join the outer one.
+@contextlib.contextmanager
+def session(destination=None):
+    destination = destination or os.environ.get(ENV_VAR)
+    if not destination or TRACER.enabled:
+        yield TRACER
+        return
+    if destination == '1':
+        destination = '-'
+
+    TRACER.reset()
+    TRACER.enabled = True
+    if destination.endswith('.prof'):
+        TRACER.profiler = cProfile.Profile()
+        TRACER.profiler.enable()
+    try:
+        yield TRACER
+    finally:
+        if TRACER.profiler is not None:
+            TRACER.profiler.disable()
+        TRACER.enabled = False
+        write_report(destination)
@@ -0,0 +1,160 @@
+import os
+import sys
+
+BACKENDS = ('auto', 'windows', 'ewmh', 'fake')
+
+
+class WindowBackend:
+    """What the window tools need from a display server.
+
+    Every method works on a whole batch of windows, so an implementation can
+    answer with a fixed number of round trips no matter how many windows exist.
+    Handles are opaque (HWND on Windows, X11 window ids on Linux).
+    """
+
+    # Function to list the top-level windows as [(handle, title), ...]
+    def list_windows(self):
+        raise NotImplementedError
+
+    # Function to look up the owning pid of each handle as {handle: pid}
+    def window_pids(self, handles):
+        raise NotImplementedError
+
+    # Function to apply [(handle, x, y, width, height), ...] in one batch
+    def move_resize(self, placements):
+        raise NotImplementedError
+
+    # Function to return (width, height) of the primary screen
+    def screen_size(self):
+        raise NotImplementedError
+
+
+class WindowsBackend(WindowBackend):
+    """Win32 through pygetwindow for listing and user32 for pids, geometry and the screen size."""
+
+    def __init__(self):
+        import ctypes
+        import pygetwindow as gw
+        self.ctypes = ctypes
+        self.gw = gw
+        self.user32 = ctypes.windll.user32
+
+    def list_windows(self):
+        return [(window._hWnd, window.title) for window in self.gw.getAllWindows()]
+
+    def window_pids(self, handles):
+        pids = {}
+        pid = self.ctypes.c_ulong()
+        for handle in handles:
+            self.user32.GetWindowThreadProcessId(handle, self.ctypes.byref(pid))
+            pids[handle] = pid.value
+        return pids
+
+    def move_resize(self, placements):
+        for handle, x, y, width, height in placements:
+            self.user32.MoveWindow(handle, x, y, width, height, True)
+
+    def screen_size(self):
+        return self.user32.GetSystemMetrics(0), self.user32.GetSystemMetrics(1)
+
+
+class EwmhBackend(WindowBackend):
+    """X11 window managers that follow EWMH, through xcffib.
+
+    Requests are pipelined: all property requests for a batch are sent before any
+    reply is read, so listing N windows costs a constant number of round trips.
+    """
+
+    ATOM_NAMES = ('_NET_CLIENT_LIST', '_NET_WM_NAME', '_NET_WM_PID', 'UTF8_STRING', 'WM_NAME')
+
+    def __init__(self, display=None):
+        import xcffib
+        import xcffib.xproto
+        self.xproto = xcffib.xproto
+        self.conn = xcffib.connect(display=display)
+        self.screen = self.conn.get_setup().roots[self.conn.pref_screen]
+        cookies = {name: self.conn.core.InternAtom(False, len(name), name) for name in self.ATOM_NAMES}
+        self.atoms = {name: cookie.reply().atom for name, cookie in cookies.items()}
+
+    # Function to send one GetProperty per window, then collect every reply
+    def get_properties(self, windows, atom, atom_type):
+        cookies = [self.conn.core.GetProperty(False, window, atom, atom_type, 0, 1024) for window in windows]
+        return [cookie.reply() for cookie in cookies]
+
+    def list_windows(self):
+        Atom = self.xproto.Atom
+        client_list = self.conn.core.GetProperty(False, self.screen.root, self.atoms['_NET_CLIENT_LIST'],
+                                                 Atom.WINDOW, 0, 2 ** 16).reply()
+        handles = list(client_list.value.to_atoms())
+
+        # _NET_WM_NAME is UTF-8; fall back to the legacy WM_NAME only where it is missing
+        names = self.get_properties(handles, self.atoms['_NET_WM_NAME'], self.atoms['UTF8_STRING'])
+        missing = [index for index, reply in enumerate(names) if not reply.value_len]
+        legacy = self.get_properties([handles[index] for index in missing], Atom.WM_NAME, Atom.STRING)
+        titles = [b"".join(reply.value).decode('utf-8', errors='replace') for reply in names]
+        for index, reply in zip(missing, legacy):
+            titles[index] = b"".join(reply.value).decode('latin-1')
+        return list(zip(handles, titles))
+
+    def window_pids(self, handles):
+        handles = list(handles)
+        replies = self.get_properties(handles, self.atoms['_NET_WM_PID'], self.xproto.Atom.CARDINAL)
+        return {handle: reply.value.to_atoms()[0] if reply.value_len else None
+                for handle, reply in zip(handles, replies)}
+
+    def move_resize(self, placements):
+        ConfigWindow = self.xproto.ConfigWindow
+        mask = ConfigWindow.X | ConfigWindow.Y | ConfigWindow.Width | ConfigWindow.Height
+        for handle, x, y, width, height in placements:
+            self.conn.core.ConfigureWindow(handle, mask, [x, y, width, height])
+        self.conn.flush()  # one write for the whole batch
+
+    def screen_size(self):
+        return self.screen.width_in_pixels, self.screen.height_in_pixels
+
+
+class FakeWindowBackend(WindowBackend):
+    """In-memory windows for tests and benchmarks; counts calls like display round trips."""
+
+    def __init__(self, windows=(), screen=(1920, 1080)):
+        # windows: iterable of (handle, title, pid)
+        self.windows = {handle: {'title': title, 'pid': pid, 'geometry': None} for handle, title, pid in windows}
+        self.screen = screen
+        self.round_trips = 0
+
+    def add_window(self, handle, title, pid):
+        self.windows[handle] = {'title': title, 'pid': pid, 'geometry': None}
+
+    def remove_window(self, handle):
+        self.windows.pop(handle, None)
+
+    def list_windows(self):
+        self.round_trips += 1
+        return [(handle, window['title']) for handle, window in self.windows.items()]
+
+    def window_pids(self, handles):
+        self.round_trips += 1
+        return {handle: self.windows[handle]['pid'] for handle in handles if handle in self.windows}
+
+    def move_resize(self, placements):
+        self.round_trips += 1
+        for handle, x, y, width, height in placements:
+            if handle in self.windows:
+                self.windows[handle]['geometry'] = (x, y, width, height)
+
+    def screen_size(self):
+        return self.screen
+
+
+# Function to pick a backend: RANDOMTOOLS_WINDOW_BACKEND, else Win32 on Windows and EWMH elsewhere
+def get_window_backend(name=None):
+    name = name or os.environ.get('RANDOMTOOLS_WINDOW_BACKEND', 'auto')
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown window backend '{name}' (choose from {', '.join(BACKENDS)})")
+    if name == 'auto':
+        name = 'windows' if sys.platform == 'win32' else 'ewmh'
+    if name == 'windows':
+        return WindowsBackend()
+    if name == 'ewmh':
+        return EwmhBackend()
+    return FakeWindowBackend()
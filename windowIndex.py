@@ -0,0 +1,50 @@
+from windowBackends import get_window_backend
+
+
+class WindowIndex:
+    """Open windows keyed by handle and owning pid.
+
+    refresh() keeps entries for windows it has already seen and only asks the
+    backend for the owning pids of new ones (in one batch), so repeated
+    refreshes stay cheap.
+    """
+
+    def __init__(self, backend=None):
+        self.backend = backend if backend is not None else get_window_backend()
+        self.windows = {}   # handle -> {'handle', 'title', 'pid'}
+        self.by_pid = {}    # pid -> [entry, ...]
+
+    # Function to sync with the current window list; returns (added, removed) counts
+    def refresh(self):
+        current = {}
+        new_entries = []
+        for handle, title in self.backend.list_windows():
+            if not title.strip():
+                continue
+            entry = self.windows.get(handle)
+            if entry is None:
+                entry = {'handle': handle, 'title': title, 'pid': None}
+                new_entries.append(entry)
+            else:
+                entry['title'] = title  # titles change (e.g. the active browser tab)
+            current[handle] = entry
+        if new_entries:
+            pids = self.backend.window_pids([entry['handle'] for entry in new_entries])
+            for entry in new_entries:
+                entry['pid'] = pids.get(entry['handle'])
+        removed = len(self.windows.keys() - current.keys())
+        self.windows = current
+
+        self.by_pid = {}
+        for entry in current.values():
+            self.by_pid.setdefault(entry['pid'], []).append(entry)
+        return len(new_entries), removed
+
+    def titles(self):
+        return [entry['title'] for entry in self.windows.values()]
+
+    def for_pid(self, pid):
+        return self.by_pid.get(pid, [])
+
+    def pids(self):
+        return set(self.by_pid) - {None}